@@ -1,14 +1,33 @@
-import subprocess
+import argparse
 import csv
-import time
+import json
+import math
+import os
+import statistics
+import sys
+from functools import lru_cache
+from multiprocessing import Pool
 from pathlib import Path
 
+# Allow running as a plain script: python experiments/compare_methods.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from solver.cli import build_parser, solve
+from solver.problem import SubsetSum
+
+# Benchmark harness: every algorithm x instance x seed runs in-process on a pool
+# of worker processes (each worker parses an instance once and reuses it), the
+# per-run results are aggregated over seeds and written as CSV and JSON, and the
+# summary can be checked against a stored baseline.
+
+DATA_DIR = Path(__file__).parent / 'data'
+
 # Configuration of test instances: (label, file path)
 TEST_INSTANCES = [
-    ('huge', 'data/huge.txt'),
-    ('large', 'data/large.txt'),
-    # ('medium', 'data/medium.txt'),  # optional smaller tests
-    # ('small', 'data/small.txt'),
+    ('huge', DATA_DIR / 'huge.txt'),
+    ('large', DATA_DIR / 'large.txt'),
+    ('medium', DATA_DIR / 'medium.txt'),
+    ('small', DATA_DIR / 'small.txt'),
 ]
 
 # Parameters for algorithms
@@ -29,12 +48,11 @@ TABU_PARAMS = {
 }
 
 # Algorithms to compare
-# Each tuple: (label, CLI argument list)
+# Each tuple: (label, CLI argument list); --input, --seed and the budget flags are added per run
 ALGORITHMS = [
-    # ('full',     ['--algorithm', 'full']),
-    # ('hill_det', ['--algorithm', 'hill', '--neighborhood', 'all']),
-    # ('hill_rand',['--algorithm', 'hill', '--neighborhood', 'all', '--random-choice']),
-    # ('tabu',     ['--algorithm', 'tabu', '--neighborhood', 'all', '--tabu-size', TABU_PARAMS['tabu_size']]),
+    ('hill_det', ['--algorithm', 'hill', '--neighborhood', 'all']),
+    ('hill_rand', ['--algorithm', 'hill', '--neighborhood', 'all', '--random-choice']),
+    ('tabu',     ['--algorithm', 'tabu', '--neighborhood', 'all', '--tabu-size', TABU_PARAMS['tabu_size']]),
     ('sa_exp',   [
         '--algorithm', 'sa',
         '--schedule', SA_EXP_PARAMS['schedule'],
@@ -49,56 +67,228 @@ ALGORITHMS = [
         '--alpha', SA_LIN_PARAMS['alpha'],
         '--min-temp', SA_LIN_PARAMS['min_temp'],
     ]),
+    ('pt',       ['--algorithm', 'pt']),
+    ('vga',      ['--algorithm', 'vga']),
 ]
 
-CLI_SCRIPT = ['python', '-m', 'solver.cli']
-OUTPUT_CSV = Path(__file__).parent.parent / 'results.csv'
-LOGS_DIR = Path(__file__).parent.parent / 'experiments' / 'logs'
+OUTPUT_PREFIX = Path(__file__).parent.parent / 'results'
+# z-value of the two-sided 95% normal confidence interval of the mean
+Z_95 = 1.96
+# Shortest mean run time (s) at which evaluations/sec are compared against a baseline
+MIN_RATE_SECONDS = 1.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Run the algorithm x instance x seed benchmark matrix in-process.')
+    parser.add_argument('--instances', nargs='+', choices=[name for name, _ in TEST_INSTANCES],
+                        default=['huge', 'large'],
+                        help='Instances to run (default: huge large)')
+    parser.add_argument('--algorithms', nargs='+', choices=[name for name, _ in ALGORITHMS],
+                        default=[name for name, _ in ALGORITHMS],
+                        help='Algorithm configurations to run (default: all)')
+    parser.add_argument('--seeds', type=int, default=5,
+                        help='Number of seeds per configuration (seeds 1..N)')
+    parser.add_argument('--time-limit', '-t', type=float, default=10.0,
+                        help='Wall-clock limit per run in seconds')
+    parser.add_argument('--max-evals', type=int,
+                        help='Evaluation limit per run; makes the matrix reproducible across machines')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count(),
+                        help='Worker processes (1 runs everything in this process)')
+    parser.add_argument('--target-gap', type=int, default=0,
+                        help='Runs reaching |Sum - Target| <= this count as hits for time-to-target')
+    parser.add_argument('--stop-at-target', action='store_true',
+                        help='End each run as soon as it reaches --target-gap instead of using its whole budget')
+    parser.add_argument('--output', '-o', default=str(OUTPUT_PREFIX),
+                        help='Output prefix: writes PREFIX.csv (runs), PREFIX_summary.csv and PREFIX.json')
+    parser.add_argument('--baseline',
+                        help='JSON output of an earlier run; exit with status 1 on a regression against it')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Allowed relative increase of the median gap and drop of the hit rate')
+    parser.add_argument('--time-tolerance', type=float, default=0.5,
+                        help='Allowed relative increase of the median time-to-target')
+    parser.add_argument('--rate-tolerance', type=float,
+                        help='Also check evaluations/sec: allowed relative drop (off by default; '
+                             f'only compared when runs last at least {MIN_RATE_SECONDS:g}s on average)')
+    return parser.parse_args()
+
+
+@lru_cache(maxsize=None)
+def load_instance(path: str) -> SubsetSum:
+    # Parsed once per worker process and shared by all runs on that instance
+    return SubsetSum.from_file(path)
+
+
+def run_job(job):
+    """Run one (instance, algorithm, seed) configuration and return its result record."""
+    name, path, label, alg_args, seed, time_limit, max_evals, target_gap, stop_at_target = job
+    budget_args = ['--time-limit', str(time_limit)]
+    if max_evals is not None:
+        budget_args += ['--max-evals', str(max_evals)]
+    if stop_at_target:
+        budget_args += ['--stop-at', str(target_gap)]
+    args = build_parser().parse_args(alg_args + ['--input', path, '--seed', str(seed)] + budget_args)
+    record = {'instance': name, 'algorithm': label, 'seed': seed, 'time_limit': time_limit}
+    try:
+        best_sol, best_obj, history, elapsed, run_metrics = solve(args, load_instance(path), log=lambda msg: None)
+    except ValueError as e:
+        record['error'] = str(e)
+        return record
+
+    record.update(
+        sum_diff=best_obj,
+        elapsed=elapsed,
+        time_to_target=time_to_target(history, target_gap),
+        improvements=len(history),
+        evaluations=run_metrics.counters['evaluations'],
+        evaluations_per_sec=run_metrics.as_dict()['evaluations_per_sec'],
+    )
+    return record
+
+
+def time_to_target(history, target_gap):
+    """Elapsed time of the first history entry with best_obj <= target_gap (None if never reached)."""
+    for t, obj, *_ in history:
+        if obj <= target_gap:
+            return t
+    return None
+
+
+def summarize(runs):
+    """Aggregate the runs of each (instance, algorithm) over seeds."""
+    groups = {}
+    for run in runs:
+        groups.setdefault((run['instance'], run['algorithm']), []).append(run)
+
+    summary = []
+    for (instance, algorithm), group in groups.items():
+        done = [run for run in group if 'error' not in run]
+        gaps = [run['sum_diff'] for run in done]
+        hits = [run['time_to_target'] for run in done if run['time_to_target'] is not None]
+        row = {
+            'instance': instance,
+            'algorithm': algorithm,
+            'runs': len(done),
+            'errors': len(group) - len(done),
+            'mean_gap': statistics.fmean(gaps) if gaps else None,
+            'median_gap': statistics.median(gaps) if gaps else None,
+            'ci95_gap': Z_95 * statistics.stdev(gaps) / math.sqrt(len(gaps)) if len(gaps) > 1 else 0.0,
+            'best_gap': min(gaps, default=None),
+            'worst_gap': max(gaps, default=None),
+            'hit_rate': len(hits) / len(done) if done else 0.0,
+            'median_time_to_target': statistics.median(hits) if hits else None,
+            'mean_elapsed': statistics.fmean(run['elapsed'] for run in done) if done else None,
+            'mean_evaluations_per_sec':
+                statistics.fmean(run['evaluations_per_sec'] for run in done) if done else None,
+        }
+        summary.append(row)
+    return sorted(summary, key=lambda row: (row['instance'], row['algorithm']))
+
+
+def find_regressions(summary, baseline, tolerance, time_tolerance, rate_tolerance=None):
+    """
+    Compare the summary with a baseline summary; returns a list of messages.
+
+    Throughput (evaluations/sec) is only compared when rate_tolerance is given
+    and the runs of both summaries last at least MIN_RATE_SECONDS on average:
+    short runs are dominated by start-up costs and timer noise.
+    """
+    reference = {(row['instance'], row['algorithm']): row for row in baseline['summary']}
+    regressions = []
+    for row in summary:
+        base = reference.get((row['instance'], row['algorithm']))
+        if base is None or row['median_gap'] is None or base['median_gap'] is None:
+            continue
+        key = f"{row['instance']}/{row['algorithm']}"
+        if row['median_gap'] > base['median_gap'] * (1 + tolerance):
+            regressions.append(f"{key}: median gap {row['median_gap']} (baseline {base['median_gap']})")
+        if row['hit_rate'] < base['hit_rate'] * (1 - tolerance):
+            regressions.append(f"{key}: hit rate {row['hit_rate']:.2f} (baseline {base['hit_rate']:.2f})")
+        ttt, base_ttt = row['median_time_to_target'], base['median_time_to_target']
+        if ttt is not None and base_ttt is not None and ttt > base_ttt * (1 + time_tolerance):
+            regressions.append(f"{key}: median time-to-target {ttt:.3f}s (baseline {base_ttt:.3f}s)")
+        rate, base_rate = row['mean_evaluations_per_sec'], base.get('mean_evaluations_per_sec')
+        long_enough = min(row['mean_elapsed'] or 0, base.get('mean_elapsed') or 0) >= MIN_RATE_SECONDS
+        if rate_tolerance is not None and long_enough and rate is not None and base_rate \
+                and rate < base_rate * (1 - rate_tolerance):
+            regressions.append(f"{key}: {rate:.0f} evals/s (baseline {base_rate:.0f} evals/s)")
+    return regressions
+
+
+def write_csv(path, rows, columns):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
 
 
 def main():
-    # Ensure the logs directory exists
-    LOGS_DIR.mkdir(parents=True, exist_ok=True)
-
-    # Open summary CSV for writing overall results
-    with open(OUTPUT_CSV, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        # Write CSV header
-        writer.writerow(['instance', 'algorithm', 'seed', 'time_limit', 'sum_diff', 'elapsed'])
-
-        # Loop over each test instance
-        for name, path in TEST_INSTANCES:
-            # Loop over each algorithm variant
-            for alg_name, alg_args in ALGORITHMS:
-                # Common CLI arguments for all runs
-                default_args = ['--input', path, '--seed', '1', '--time-limit', '60']
-                # Include custom label so logs are named accordingly
-                label_arg = ['--label', alg_name]
-                # Construct full command
-                cmd = CLI_SCRIPT + label_arg + alg_args + default_args
-                print(f"Running: {cmd}")
-
-                start_time = time.time()
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                elapsed = time.time() - start_time
-
-                # Handle CLI errors gracefully
-                if result.returncode != 0:
-                    print(f"Error running {alg_name} on {name}: {result.stderr}")
-                    continue
-
-                # Parse the final |Sum - Target| from CLI output
-                sum_diff = None
-                for line in result.stdout.strip().splitlines():
-                    if line.startswith('|Sum'):
-                        parts = line.split(':')
-                        if len(parts) == 2:
-                            sum_diff = parts[1].strip()
-
-                # Append a row to the summary CSV
-                writer.writerow([name, alg_name, 1, 60, sum_diff, f"{elapsed:.2f}"])
-
-    print(f"Results saved to {OUTPUT_CSV}")
+    args = parse_args()
+
+    # Instance-major order, so each worker mostly reuses the instance it already parsed
+    instances = [(name, str(path)) for name, path in TEST_INSTANCES if name in args.instances]
+    algorithms = [(label, alg_args) for label, alg_args in ALGORITHMS if label in args.algorithms]
+    jobs = [
+        (name, path, label, alg_args, seed, args.time_limit, args.max_evals, args.target_gap,
+         args.stop_at_target)
+        for name, path in instances
+        for label, alg_args in algorithms
+        for seed in range(1, args.seeds + 1)
+    ]
+    print(f"Running {len(jobs)} jobs on {args.workers} worker(s)")
+
+    runs = []
+
+    def report(record):
+        runs.append(record)
+        status = record.get('error', f"|Sum - Target| = {record.get('sum_diff')}")
+        print(f"[{len(runs)}/{len(jobs)}] {record['instance']} {record['algorithm']} "
+              f"seed {record['seed']}: {status}")
+
+    if args.workers > 1:
+        with Pool(args.workers) as pool:
+            for record in pool.imap_unordered(run_job, jobs):
+                report(record)
+    else:
+        for job in jobs:
+            report(run_job(job))
+
+    runs.sort(key=lambda run: (run['instance'], run['algorithm'], run['seed']))
+    summary = summarize(runs)
+
+    # Save per-run rows, the aggregated summary and both as JSON
+    prefix = Path(args.output)
+    write_csv(prefix.with_suffix('.csv'), runs,
+              ['instance', 'algorithm', 'seed', 'time_limit', 'sum_diff', 'elapsed',
+               'time_to_target', 'improvements', 'evaluations', 'evaluations_per_sec', 'error'])
+    summary_csv = prefix.with_name(prefix.name + '_summary.csv')
+    write_csv(summary_csv, summary, list(summary[0]) if summary else [])
+    config = {key: value for key, value in vars(args).items() if key != 'baseline'}
+    with open(prefix.with_suffix('.json'), 'w') as f:
+        json.dump({'config': config, 'runs': runs, 'summary': summary}, f, indent=2)
+
+    for row in summary:
+        if not row['runs']:
+            print(f"{row['instance']:>8} {row['algorithm']:>10}: all runs failed")
+            continue
+        ttt = row['median_time_to_target']
+        print(f"{row['instance']:>8} {row['algorithm']:>10}: median gap {row['median_gap']}, "
+              f"mean {row['mean_gap']:.1f} ± {row['ci95_gap']:.1f}, hit rate {row['hit_rate']:.2f}, "
+              f"median time-to-target {'-' if ttt is None else f'{ttt:.3f}s'}, "
+              f"{row['mean_evaluations_per_sec']:.0f} evals/s")
+    print(f"Results saved to {prefix.with_suffix('.csv')}, {summary_csv} and {prefix.with_suffix('.json')}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(summary, baseline, args.tolerance, args.time_tolerance,
+                                       args.rate_tolerance)
+        if regressions:
+            print('Regressions against the baseline:')
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print('No regressions against the baseline')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,349 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from solver import metrics
+from solver.budget import Budget, start_budget
+from solver.problem import SubsetSum, Solution
+
+# Bytes per representable sum: int32 parent entry plus the reachable-sums bitset
+# and the temporaries created while shifting it (about three bitsets at a time)
+BYTES_PER_SUM = 4 + 3 / 8
+# Swaps 0/1 bytes: the complement of a subset
+_COMPLEMENT = bytes.maketrans(b'\x00\x01', b'\x01\x00')
+
+
+def dp_bound(problem: SubsetSum) -> int:
+    """
+    Largest sum the DP has to represent.
+
+    A subset summing to more than 2*target is worse than the empty subset,
+    so sums are capped at min(sum(values), 2*target).
+    """
+    return max(0, min(sum(int(v) for v in problem.values), 2 * problem.target))
+
+
+def dp_memory_estimate(problem: SubsetSum) -> int:
+    """Estimated peak memory (in bytes) used by dp_search on this instance."""
+    return int((dp_bound(problem) + 1) * BYTES_PER_SUM)
+
+
+def dp_search(
+    problem: SubsetSum,
+    time_limit: float = None,
+    max_memory_mb: float = 1024,
+    budget: Budget = None
+) -> Tuple[Solution, int, List[Tuple[float, int]]]:
+    """
+    Exact pseudo-polynomial search over reachable sums (bitset shift-or DP).
+
+    The set of reachable sums is kept as the bits of a Python integer and each
+    value v is folded in with reach |= reach << v. Every newly reached sum
+    remembers the item that reached it first, so the subset closest to the
+    target can be reconstructed by walking back from that sum.
+
+    The search first fixes the largest values as selected, leaving a small
+    residual target, and runs the DP over the remaining values only. If that
+    hits the target exactly the answer is optimal and the full DP over
+    [0, min(sum, 2*target)] is skipped; otherwise the full DP runs with the
+    residual answer as the incumbent.
+
+    Args:
+        problem: SubsetSum instance with non-negative integer values.
+        time_limit: Optional max runtime (in seconds); on timeout the best sum
+            reached so far is returned (optimality is then not certified).
+        max_memory_mb: Refuse to run if the estimated memory exceeds this many MB.
+        budget: Optional Budget overriding time_limit; one folded item is one
+            iteration and every newly reached sum one evaluation. Checked per item.
+
+    Returns:
+        best_solution: Solution closest to the target.
+        best_obj: int best objective value |sum(selected) - target|.
+        history: List of (elapsed_time, best_obj) tuples at each improvement.
+
+    Raises:
+        ValueError: on negative values or when the sum range is too large.
+    """
+    values = [int(v) for v in problem.values]
+    if any(v < 0 for v in values):
+        raise ValueError("The dp algorithm requires non-negative values")
+
+    estimate = dp_memory_estimate(problem)
+    if estimate > max_memory_mb * 2 ** 20:
+        raise ValueError(
+            f"The dp algorithm would need about {estimate / 2 ** 20:.0f} MB "
+            f"(limit {max_memory_mb:.0f} MB); the sum range is too large")
+
+    budget = start_budget(budget, time_limit)
+    target = problem.target
+    # Largest values first: sums near the target appear after few items
+    order = sorted(range(problem.n), key=values.__getitem__, reverse=True)
+
+    # The empty subset is the starting incumbent
+    best_bits = bytearray(problem.n)
+    best_obj = abs(target)
+    history = budget.history((0.0, best_obj))
+    # Sums reached and items folded over both phases
+    work = (0, 0)
+
+    # Phase 1: fix the longest run of largest values that leaves a residual
+    # target of at least `slack`, then solve the residual instance
+    slack = 2 * max(values, default=0) * problem.n.bit_length()
+    fixed = 0
+    residual = target
+    while fixed < len(order) and residual - values[order[fixed]] >= slack:
+        residual -= values[order[fixed]]
+        fixed += 1
+    if fixed:
+        with metrics.phase('residual'):
+            found, best_obj, parent, work = _closest_sum(
+                values, order[fixed:], residual, best_obj, history, budget, work)
+        if found is not None:
+            best_bits = _walk_back(parent, values, found, problem.n)
+            for i in order[:fixed]:
+                best_bits[i] = 1
+
+    # Phase 2: full DP, needed only if the target was not hit exactly
+    if best_obj > 0:
+        with metrics.phase('full'):
+            found, best_obj, parent, work = _closest_sum(
+                values, order, target, best_obj, history, budget, work)
+        if found is not None:
+            best_bits = _walk_back(parent, values, found, problem.n)
+
+    reached, folded = work
+    metrics.count(evaluations=reached, iterations=folded)
+    return problem.solution(best_bits), best_obj, history
+
+
+def _closest_sum(
+    values: Sequence[int],
+    items: Sequence[int],
+    target: int,
+    best_obj: int,
+    history: List[Tuple[float, int]],
+    budget: Budget,
+    work: Tuple[int, int]
+) -> Tuple[Optional[int], int, np.ndarray, Tuple[int, int]]:
+    """
+    Fold the given items into a reachable-sums bitset, tracking the sum closest to target.
+
+    Only sums strictly better than the incoming best_obj count as improvements;
+    they are appended to history.
+
+    Returns:
+        best_sum: the closest sum found, or None if nothing beat best_obj.
+        best_obj: the (possibly unchanged) best objective value.
+        parent: parent[s] is the item that first made sum s reachable.
+        work: the incoming (sums reached, items folded) plus this call's work.
+    """
+    bound = max(0, min(sum(values[i] for i in items), 2 * target))
+    parent = np.zeros(bound + 1, dtype=np.int32)
+    reach = 1  # bit s set <=> sum s is reachable; only the empty sum at first
+    best_sum = None
+    mask_limit, mask = -1, 0
+    reached, folded = work
+
+    for i in items:
+        if best_obj == 0:
+            break
+        # Stop once the budget is spent
+        if budget.exhausted(reached, folded):
+            break
+
+        v = values[i]
+        # Sums above target + best_obj can never lead to a better answer
+        limit = min(bound, target + best_obj)
+        if v == 0 or v > limit:
+            continue
+
+        if limit != mask_limit:
+            mask_limit = limit
+            mask = (1 << (limit + 1)) - 1
+        shifted = reach << v
+        if shifted.bit_length() > limit + 1:
+            shifted &= mask
+        merged = reach | shifted
+        new = merged ^ reach
+        if not new:
+            continue
+        reach = merged
+
+        sums = _bit_positions(new)
+        parent[sums] = i
+        folded += 1
+        reached += len(sums)
+
+        # Record improvement if a new sum is closer to the target
+        k = np.argmin(np.abs(sums - target))
+        if abs(int(sums[k]) - target) < best_obj:
+            best_sum = int(sums[k])
+            best_obj = abs(best_sum - target)
+            history.append((budget.elapsed(), best_obj))
+
+    return best_sum, best_obj, parent, (reached, folded)
+
+
+def _walk_back(parent: np.ndarray, values: Sequence[int], s: int, n: int) -> bytearray:
+    # Walk back from sum s through the items that first reached each sum
+    bits = bytearray(n)
+    while s > 0:
+        i = int(parent[s])
+        bits[i] = 1
+        s -= values[i]
+    return bits
+
+
+def _bit_positions(x: int) -> np.ndarray:
+    # Positions of the set bits of x: scan the bytes, unpack only non-zero ones
+    raw = np.frombuffer(x.to_bytes((x.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    nonzero = np.flatnonzero(raw)
+    unpacked = np.unpackbits(raw[nonzero], bitorder='little').reshape(-1, 8)
+    rows, cols = np.nonzero(unpacked)
+    return nonzero[rows] * 8 + cols
+
+
+class SumIndex:
+    """
+    Reachable-sums index answering many targets over one set of values.
+
+    The DP runs once, target-independent: values are divided by their gcd g
+    and folded into the reachable sums up to half of their total, each newly
+    reached sum remembering the item that reached it first. Every reachable
+    sum above the half is the complement of one below it, so a query looks up
+    the reachable sums nearest to target/g and to (total - target)/g by binary
+    search and walks back the parents only for the answer.
+
+    The bitset is split into a prefix of sums that are all reachable (kept as
+    a single count) and the bits above it. Values are folded smallest first,
+    so on dense instances the prefix absorbs almost every sum and each fold
+    only touches the bits near its frontier.
+
+    Attributes:
+        problem: the SubsetSum instance the index was built for (its target is ignored).
+        scale: gcd of the values; every reachable sum is a multiple of it.
+        total: sum of the values divided by scale.
+        prefix: reduced sums 0 .. prefix-1 are all reachable.
+        upper: sorted offsets (from prefix) of the other reachable reduced sums up to total // 2.
+    """
+
+    def __init__(self, problem: SubsetSum, max_memory_mb: float = 1024):
+        """
+        Build the index.
+
+        Args:
+            problem: SubsetSum instance with non-negative integer values.
+            max_memory_mb: Refuse to build if the estimated memory exceeds this many MB.
+
+        Raises:
+            ValueError: on negative values or when the sum range is too large.
+        """
+        values = np.asarray(problem.values, dtype=np.int64)
+        if problem.n and values.min() < 0:
+            raise ValueError("The sum index requires non-negative values")
+
+        self.problem = problem
+        self.scale = int(np.gcd.reduce(values)) if problem.n else 0
+        self.scale = self.scale or 1
+        reduced = (values // self.scale).tolist()
+        self.total = sum(reduced)
+        half = self.total // 2
+
+        estimate = int((half + 1) * BYTES_PER_SUM)
+        if estimate > max_memory_mb * 2 ** 20:
+            raise ValueError(
+                f"The sum index would need about {estimate / 2 ** 20:.0f} MB "
+                f"(limit {max_memory_mb:.0f} MB); the sum range is too large")
+
+        self._values = reduced
+        order = sorted(range(problem.n), key=reduced.__getitem__)
+        self.prefix, self.upper, self._parent = _fold_reachable(reduced, order, half)
+
+    def closest(self, target: int) -> int:
+        """Achievable sum closest to target (ties go to the smaller sum)."""
+        return self._closest(target)[0]
+
+    def query(self, target: int) -> Tuple[Solution, int]:
+        """
+        Closest achievable sum to target together with a subset reaching it.
+
+        Returns:
+            solution: Solution over a copy of the instance whose target is `target`.
+            obj: |sum(selected) - target|.
+        """
+        best_sum, reduced_sum, mirrored = self._closest(target)
+        bits = _walk_back(self._parent, self._values, reduced_sum, self.problem.n)
+        if mirrored:
+            bits = bits.translate(_COMPLEMENT)
+        solution = SubsetSum(self.problem.values, target).solution(bits)
+        return solution, abs(best_sum - target)
+
+    def _closest(self, target: int) -> Tuple[int, int, bool]:
+        # Best of the reachable sums around target and the complements around total - target
+        g = self.scale
+        candidates = []
+        for goal, mirrored in ((target, False), (self.total * g - target, True)):
+            for s in (self._below(goal // g), self._above(-(-goal // g))):
+                if s is not None:
+                    achieved = (self.total - s if mirrored else s) * g
+                    candidates.append((abs(achieved - target), achieved, s, mirrored))
+        _, best_sum, reduced_sum, mirrored = min(candidates)
+        return best_sum, reduced_sum, mirrored
+
+    def _below(self, x: int) -> Optional[int]:
+        # Largest reachable reduced sum <= x (only sums up to total // 2 are stored)
+        if x < 0:
+            return None
+        if x < self.prefix:
+            return x
+        k = int(np.searchsorted(self.upper, x - self.prefix, side='right'))
+        return self.prefix + int(self.upper[k - 1]) if k else self.prefix - 1
+
+    def _above(self, x: int) -> Optional[int]:
+        # Smallest stored reachable reduced sum >= x
+        if x < self.prefix:
+            return max(x, 0)
+        k = int(np.searchsorted(self.upper, x - self.prefix, side='left'))
+        return self.prefix + int(self.upper[k]) if k < len(self.upper) else None
+
+
+def _fold_reachable(
+    values: Sequence[int],
+    items: Sequence[int],
+    bound: int
+) -> Tuple[int, np.ndarray, np.ndarray]:
+    """
+    Fold the given items into the reachable sums up to bound.
+
+    Returns:
+        prefix: sums 0 .. prefix-1 are all reachable.
+        upper: sorted offsets from prefix of the other reachable sums.
+        parent: parent[s] is the item that first made sum s reachable.
+    """
+    parent = np.zeros(bound + 1, dtype=np.int32)
+    prefix = 1  # only the empty sum at first
+    high = 0    # bit j set <=> sum prefix + j is reachable; bit 0 is always clear
+
+    for i in items:
+        v = values[i]
+        if v == 0 or v > bound:
+            continue
+        if prefix > bound:
+            break
+        # Sums reached from the prefix are [v, prefix + v), i.e. offsets [v - prefix, v)
+        block = (1 << v) - (1 << max(0, v - prefix))
+        merged = high | block | (high << v)
+        limit = bound - prefix
+        if merged.bit_length() > limit + 1:
+            merged &= (1 << (limit + 1)) - 1
+        new = merged ^ high
+        if not new:
+            continue
+        parent[prefix + _bit_positions(new)] = i
+
+        # Absorb the run of reachable sums at the bottom into the prefix
+        run = (~merged & (merged + 1)).bit_length() - 1
+        prefix += run
+        high = merged >> run
+
+    return prefix, _bit_positions(high), parent
@@ -1,53 +1,227 @@
-import itertools
 import math
 import time
-from typing import Tuple, List
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Tuple, List, Optional, Sequence
 
-from solver.problem import SubsetSum
+import numpy as np
+
+from solver import metrics
+from solver.budget import Budget, start_budget
+from solver.problem import SubsetSum, Solution
+
+# Number of low bits enumerated as one vectorized block (2^16 subsets per step)
+BLOCK_BITS = 16
+# Prefix ranges handed out per worker, so uneven ranges still balance out
+TASKS_PER_WORKER = 4
 
 
 def full_search(
     problem: SubsetSum,
-    time_limit: float = None
-) -> Tuple[List[int], int, List[Tuple[float, int]]]:
+    time_limit: float = None,
+    workers: int = 1,
+    budget: Budget = None
+) -> Tuple[Solution, int, List[Tuple[float, int, float]]]:
     """
     Perform an exhaustive search over all 2^n subsets for the Subset Sum problem.
 
+    The low BLOCK_BITS bits are enumerated as one precomputed array of subset
+    sums; the remaining high bits are walked in Gray-code order, so each step
+    flips exactly one bit and updates the running sum in O(1), after which a
+    whole block of 2^BLOCK_BITS subsets is scored with one NumPy operation.
+    The budget is checked once per block.
+
+    With workers > 1 the topmost bits are fixed to every possible prefix and
+    the prefix ranges are swept in a ProcessPoolExecutor. Workers share the
+    best objective found so far and all stop as soon as any of them reaches 0
+    (or the budget's target_obj); their improvements are merged into a single
+    timeline once the sweep ends. The budget's stop token is honoured by the
+    single-process sweep only.
+
     Args:
         problem: SubsetSum instance containing the values list and target sum.
         time_limit: Optional max runtime (in seconds) before early termination.
+        workers: Number of worker processes (1 = sweep in this process).
+        budget: Optional Budget overriding time_limit. Every enumerated subset
+            is one evaluation and every block one iteration; with several
+            workers the count limits are split evenly over the prefix ranges.
 
     Returns:
-        best_solution: List[int] bit vector representing the best subset found.
+        best_solution: Solution bit vector representing the best subset found.
         best_obj: int best objective value |sum(selected) - target|.
-        history: List of (elapsed_time, best_obj) tuples at each improvement.
+        history: List of (elapsed_time, best_obj, subsets_per_second) tuples at
+            each improvement.
+            With several workers the rate column holds the overall rate of the run.
     """
-    # Initialize best solution placeholder and improvement history
-    best_solution: List[int] = []
-    best_obj: int = math.inf
-    history: List[Tuple[float, int]] = []
-
     start_time = time.time()
+    budget = start_budget(budget, time_limit)
+    remaining = budget.remaining_time()
+    # Absolute deadline on the wall clock, comparable across worker processes
+    deadline = start_time + remaining if remaining is not None else None
+    values = [int(v) for v in problem.values]
+    low = min(problem.n, BLOCK_BITS)
+    high = problem.n - low
+
+    # Number of fixed prefix bits: enough ranges to keep every worker busy
+    prefix_bits = 0
+    if workers > 1:
+        prefix_bits = min(high, math.ceil(math.log2(workers * TASKS_PER_WORKER)))
+
+    # Count limits as a cap on enumerated subsets per prefix range
+    max_evals = budget.max_evals
+    if budget.max_iters is not None:
+        block_evals = budget.max_iters << low
+        max_evals = block_evals if max_evals is None else min(max_evals, block_evals)
+    if max_evals is not None:
+        max_evals = -(-max_evals // (1 << prefix_bits))
+
+    # The sweep stops once the best objective is good enough (0 unless the budget sets a target)
+    stop_obj = budget.target_obj if budget.target_obj is not None else 0
+    history = budget.history()
+    if prefix_bits == 0:
+        def report(event):
+            t, obj, count = event
+            history.append((t - start_time, obj, _rate(count, t - start_time)))
+
+        best_obj, best_mask, enumerated = _sweep(
+            values, problem.target, low, 0, 0, deadline, max_evals, None, stop_obj, budget.stop_event, report)
+    else:
+        shared_best = multiprocessing.Value('d', math.inf)
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(values, problem.target, low, prefix_bits, deadline, max_evals, shared_best,
+                          stop_obj)) as pool:
+            results = list(pool.map(_sweep_prefix, range(1 << prefix_bits)))
+
+        best_obj, best_mask, _, _ = min(results, key=lambda r: r[0])
+        enumerated = sum(r[2] for r in results)
+        elapsed = time.time() - start_time
+        rate = _rate(enumerated, elapsed)
+
+        # Merge the per-worker improvements into one running-best timeline
+        for t, obj, _ in sorted(e for r in results for e in r[3]):
+            if history.last is None or obj < history.last[1]:
+                history.append((t - start_time, obj, rate))
+
+    # Every enumerated subset is one objective evaluation
+    metrics.count(evaluations=enumerated, iterations=enumerated >> low)
+
+    # Closing entry only if the final best was not reported yet (history entries are improvements)
+    if history.last is None or best_obj < history.last[1]:
+        elapsed = time.time() - start_time
+        history.append((elapsed, best_obj, _rate(enumerated, elapsed)))
+
+    bits = bytearray(problem.n)
+    for i in range(problem.n):
+        bits[i] = (best_mask >> i) & 1
+    return problem.solution(bits), best_obj, history
+
+
+def _sweep(
+    values: Sequence[int],
+    target: int,
+    low: int,
+    prefix_bits: int,
+    prefix: int,
+    deadline: Optional[float],
+    max_evals: Optional[int],
+    shared_best,
+    stop_obj: int,
+    stop_event,
+    report: Callable[[Tuple[float, int, int]], None]
+) -> Tuple[int, int, int]:
+    """
+    Enumerate every subset whose topmost prefix_bits bits equal prefix
+    (stopping after max_evals subsets if given, rounded up to whole blocks,
+    once the best objective is <= stop_obj, or once stop_event is set).
+    Every improvement is passed to report as (time.time(), best_obj, enumerated).
+
+    Returns:
+        best_obj: best objective value in the range.
+        best_mask: bit mask (over all n values) of the best subset.
+        enumerated: number of subsets evaluated.
+    """
+    target_gap = -target
+    # Fixed prefix bits contribute a constant to every sum in the range
+    free = len(values) - prefix_bits
+    for i in range(prefix_bits):
+        if (prefix >> i) & 1:
+            target_gap += values[free + i]
+
+    # low_sums[j] is the sum of the low values selected by the bits of j
+    low_sums = np.zeros(1, dtype=np.int64)
+    for v in values[:low]:
+        low_sums = np.concatenate((low_sums, low_sums + v))
+
+    high_values = values[low:free]
+    high_selected = [0] * len(high_values)
+    high_total = 0
+    high_mask = 0
 
-    # Iterate through every combination of bits of length n
-    for bits in itertools.product([0, 1], repeat=problem.n):
-        # Stop if the time limit has been exceeded
-        if time_limit is not None and (time.time() - start_time) > time_limit:
-            break
-
-        # Convert tuple to list and evaluate objective
-        candidate = list(bits)
-        obj = problem.objective(candidate)
-
-        # Record improvement if candidate is better
-        if obj < best_obj:
-            best_obj = obj
-            best_solution = candidate.copy()
-            elapsed = time.time() - start_time
-            history.append((elapsed, best_obj))
-
-            # Exit early if perfect solution is found
-            if best_obj == 0:
+    best_obj = None
+    best_mask = 0
+    enumerated = 0
+
+    # Walk the high bits in Gray-code order: step k flips the lowest set bit of k
+    for k in range(1 << len(high_values)):
+        if k:
+            # Stop if the budget is spent or another worker hit the target
+            if deadline is not None and time.time() > deadline:
+                break
+            if max_evals is not None and enumerated >= max_evals:
                 break
+            if shared_best is not None and shared_best.value <= stop_obj:
+                break
+            if stop_event is not None and stop_event.is_set():
+                break
+            i = (k & -k).bit_length() - 1
+            if high_selected[i]:
+                high_total -= high_values[i]
+            else:
+                high_total += high_values[i]
+            high_selected[i] ^= 1
+            high_mask ^= 1 << i
+
+        # Score the whole block of low-bit subsets at once
+        objs = np.abs(low_sums + (high_total + target_gap))
+        j = int(np.argmin(objs))
+        enumerated += len(low_sums)
+
+        # Record improvement if the block holds a better subset
+        if best_obj is None or objs[j] < best_obj:
+            best_obj = int(objs[j])
+            best_mask = (((prefix << len(high_values)) | high_mask) << low) | j
+            report((time.time(), best_obj, enumerated))
+            if shared_best is not None:
+                with shared_best.get_lock():
+                    shared_best.value = min(shared_best.value, best_obj)
+
+            # Exit early once the solution is good enough
+            if best_obj <= stop_obj:
+                break
+
+    return best_obj, best_mask, enumerated
+
+
+# Per-process state of the parallel sweep, set once by the pool initializer
+_worker_args = None
+
+
+def _init_worker(values, target, low, prefix_bits, deadline, max_evals, shared_best, stop_obj):
+    global _worker_args
+    _worker_args = (values, target, low, prefix_bits, deadline, max_evals, shared_best, stop_obj)
+
+
+def _sweep_prefix(prefix: int) -> Tuple[int, int, int, List[Tuple[float, int, int]]]:
+    # Improvements are collected and sent back with the result of the range
+    values, target, low, prefix_bits, deadline, max_evals, shared_best, stop_obj = _worker_args
+    events: List[Tuple[float, int, int]] = []
+    best_obj, best_mask, enumerated = _sweep(
+        values, target, low, prefix_bits, prefix, deadline, max_evals, shared_best, stop_obj, None, events.append)
+    return best_obj, best_mask, enumerated, events
+
 
-    return best_solution, best_obj, history
+def _rate(count: int, elapsed: float) -> float:
+    # Subsets enumerated per second (0 before the clock has visibly advanced)
+    return count / elapsed if elapsed > 0 else 0.0
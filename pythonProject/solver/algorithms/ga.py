@@ -1,8 +1,11 @@
-import time
+import heapq
 import random
-from typing import List, Tuple
-from solver.problem import SubsetSum
-from solver.neighborhood import flip_neighbor, all_neighbors
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from solver import metrics
+from solver.budget import Budget, start_budget
+from solver.problem import SubsetSum, Solution, random_bits
+from solver.construct import initial_population
 
 
 def genetic_algorithm(
@@ -10,87 +13,156 @@ def genetic_algorithm(
     pop_size: int = 100,
     crossover: str = 'one_point',
     mutation: str = 'flip',
-    time_limit: float = None
-) -> Tuple[List[int], int, List[Tuple[float, int]]]:
+    time_limit: float = None,
+    cache_size: int = 10000,
+    init: str = 'random',
+    budget: Budget = None
+) -> Tuple[Solution, int, List[Tuple[float, int]]]:
     """
     Prosty algorytm genetyczny dla problemu Subset Sum z logowaniem postępu.
 
+    Populacja jest kopcem (heapq) kluczowanym wartością funkcji celu z odwróconym
+    znakiem, więc najgorszy osobnik leży w korzeniu i zastąpienie go kosztuje
+    O(log pop); dziecko zastępuje go, o ile nie jest od niego gorsze. Wartości
+    funkcji celu są zapamiętywane w ograniczonym cache LRU kluczowanym hashem
+    chromosomu; duplikaty nie są ponownie oceniane ani wstawiane do populacji.
+
     Parametry:
     - problem: instancja SubsetSum
     - pop_size: rozmiar populacji
     - crossover: 'one_point' lub 'uniform'
     - mutation: 'flip' lub 'swap'
     - time_limit: limit czasu w sekundach
+    - cache_size: maksymalna liczba zapamiętanych wartości funkcji celu
+    - init: populacja początkowa: 'random', 'rgreedy' (losowy zachłanny) albo
+      'greedy' / 'kk' (jeden osobnik z tej konstrukcji, reszta losowy zachłanny)
+    - budget: opcjonalny Budget (limity czasu, ocen i iteracji); zastępuje
+      time_limit. Iteracja to jedno dziecko, ocena to policzenie sumy (trafienia
+      w cache się nie liczą)
 
     Zwraca:
     - best_solution: najlepszy znaleziony wektor bitów
     - best_obj: wartość funkcji celu dla best_solution
     - history: lista krotek (czas od startu, best_obj) rejestrująca postęp
     """
-    start_time = time.time()
-    # Inicjalizuj populację losowymi rozwiązaniami
-    population: List[List[int]] = [problem.random_solution() for _ in range(pop_size)]
-    fitness = [problem.objective(sol) for sol in population]
-    best_sol = population[fitness.index(min(fitness))].copy()
-    best_obj = min(fitness)
-
-    history: List[Tuple[float, int]] = []
+    budget = start_budget(budget, time_limit)
+    # Inicjalizuj populację rozwiązaniami losowymi lub konstrukcyjnymi.
+    # Element kopca: (-obj, numer porządkowy, hash chromosomu, rozwiązanie);
+    # numer porządkowy rozstrzyga remisy bez porównywania rozwiązań
+    population: List[Tuple[int, int, int, Solution]] = []
+    members: Dict[int, int] = {}  # hash chromosomu -> liczba kopii w populacji
+    for seq, sol in enumerate(initial_population(problem, pop_size, init)):
+        key = hash(bytes(sol.bits))
+        population.append((-sol.objective, seq, key, sol))
+        members[key] = members.get(key, 0) + 1
+    heapq.heapify(population)
+
+    best_entry = max(population)
+    best_sol = best_entry[3].copy()
+    best_obj = -best_entry[0]
+
+    # Cache LRU: hash chromosomu -> wartość funkcji celu
+    cache: OrderedDict = OrderedDict()
+
+    history = budget.history()
     history.append((0.0, best_obj))
 
     # Helper funkcje
-    def crossover_op(parent1: List[int], parent2: List[int]) -> List[int]:
+    # Bajty 0/1 można traktować jak liczbę całkowitą: krzyżowanie jednorodne to wtedy
+    # dwie operacje bitowe zamiast pętli po n elementach
+    ones = int.from_bytes(b'\x01' * problem.n, 'little')
+
+    def crossover_op(parent1: Solution, parent2: Solution) -> bytearray:
         n = problem.n
-        if crossover == 'one_point':
+        # Przy n < 2 nie ma punktu cięcia: dziecko jest kopią pierwszego rodzica
+        if crossover == 'one_point' and n > 1:
             point = random.randrange(1, n)
-            return parent1[:point] + parent2[point:]
+            return parent1.bits[:point] + parent2.bits[point:]
         elif crossover == 'uniform':
-            return [parent1[i] if random.random() < 0.5 else parent2[i] for i in range(n)]
+            mask = int.from_bytes(random_bits(n), 'little')
+            bits1 = int.from_bytes(parent1.bits, 'little')
+            bits2 = int.from_bytes(parent2.bits, 'little')
+            child = (bits1 & mask) | (bits2 & (ones ^ mask))
+            return bytearray(child.to_bytes(n, 'little'))
         else:
-            return parent1.copy()
+            return parent1.bits[:]
 
-    def mutate(sol: List[int]) -> List[int]:
+    def mutate(child: bytearray) -> None:
+        # Mutuje bity dziecka w miejscu, jeszcze przed oceną
         n = problem.n
-        child = sol.copy()
         if mutation == 'flip':
-            idx = random.randrange(n)
-            child[idx] = 1 - child[idx]
-        elif mutation == 'swap':
+            child[random.randrange(n)] ^= 1
+        elif mutation == 'swap' and n > 1:
             i, j = random.sample(range(n), 2)
             child[i], child[j] = child[j], child[i]
-        return child
 
-    # Główna pętla (generacyjna)
-    while True:
-        if time_limit is not None and time.time() - start_time > time_limit:
-            break
+    # Selekcja rodziców (turniej 2); indeksy w liście kopca są tak samo losowe
+    def select_parent() -> Solution:
+        i, j = random.sample(range(pop_size), 2)
+        return population[i][3] if population[i][0] > population[j][0] else population[j][3]
 
-        # Selekcja rodziców (turniej 2)
-        def select_parent():
-            i, j = random.sample(range(pop_size), 2)
-            return population[i] if fitness[i] < fitness[j] else population[j]
+    # Liczniki pracy, raportowane do metryk raz na końcu
+    children = 0
+    evaluations = pop_size
+    inserted = 0
+    next_check = 0
+
+    # Główna pętla (steady-state)
+    seq = pop_size
+    while best_obj > 0:
+        # Budżet sprawdzany co porcję iteracji (zegar nie jest czytany w każdej)
+        if children >= next_check:
+            if budget.exhausted(evaluations, children):
+                break
+            next_check = children + budget.allowance(evaluations, children)
 
         parent1 = select_parent()
         parent2 = select_parent()
 
         # Krzyżowanie i mutacja
-        child = crossover_op(parent1, parent2)
-        child = mutate(child)
-        obj = problem.objective(child)
+        bits = crossover_op(parent1, parent2)
+        mutate(bits)
+        key = hash(bytes(bits))
+        children += 1
+
+        # Duplikat osobnika z populacji: nie oceniaj i nie wstawiaj ponownie
+        if key in members:
+            continue
+
+        # Ocena: najpierw cache LRU, dopiero potem liczenie sumy
+        obj = cache.get(key)
+        child = None
+        if obj is None:
+            child = problem.solution(bits)
+            obj = child.objective
+            evaluations += 1
+            cache[key] = obj
+            if len(cache) > cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
 
-        # Dodaj dziecko, usuń najgorszego
-        population.append(child)
-        fitness.append(obj)
-        worst_idx = fitness.index(max(fitness))
-        population.pop(worst_idx)
-        fitness.pop(worst_idx)
+        # Zastąp najgorszego (korzeń kopca), jeśli dziecko nie jest od niego gorsze
+        # (jak w wersji z listą: przy remisie odpada dotychczasowy osobnik)
+        if obj <= -population[0][0]:
+            if child is None:
+                child = problem.solution(bits)
+            seq += 1
+            inserted += 1
+            _, _, old_key, _ = heapq.heapreplace(population, (-obj, seq, key, child))
+            members[key] = 1
+            members[old_key] -= 1
+            if not members[old_key]:
+                del members[old_key]
 
         # Aktualizuj najlepsze
         if obj < best_obj:
             best_obj = obj
             best_sol = child.copy()
-            elapsed = time.time() - start_time
-            history.append((elapsed, best_obj))
+            history.append((budget.elapsed(), best_obj))
             if best_obj == 0:
                 break
 
-    return best_sol, best_obj, history
\ No newline at end of file
+    metrics.count(evaluations=evaluations, moves_proposed=children,
+                  moves_accepted=inserted, iterations=children)
+    return best_sol, best_obj, history
@@ -0,0 +1,110 @@
+import random
+from typing import List, Tuple
+
+import numpy as np
+
+from solver import metrics
+from solver.budget import Budget, start_budget
+from solver.problem import SubsetSum, Solution
+from solver.construct import initial_population
+
+
+def vectorized_genetic_algorithm(
+    problem: SubsetSum,
+    pop_size: int = 100,
+    crossover: str = 'one_point',
+    mutation: str = 'flip',
+    time_limit: float = None,
+    init: str = 'random',
+    budget: Budget = None
+) -> Tuple[Solution, int, List[Tuple[float, int]]]:
+    """
+    Generational genetic algorithm over a (pop_size, n) NumPy population matrix.
+
+    Every generation is produced in a handful of array operations: fitness is
+    a matrix-vector product with the values, binary tournaments are drawn for
+    the whole population at once, crossover uses a per-row mask and mutation
+    flips (or swaps) one position per child by fancy indexing. The best
+    individual is copied unchanged into the next generation (elitism).
+    The NumPy generator is seeded from the random module, so --seed applies.
+
+    Args:
+        problem: SubsetSum instance.
+        pop_size: number of individuals (rows of the population matrix).
+        crossover: 'one_point' or 'uniform'.
+        mutation: 'flip' or 'swap'.
+        time_limit: optional max runtime (in seconds).
+        init: initial population ('random', 'greedy', 'kk' or 'rgreedy';
+            see construct.initial_population).
+        budget: optional Budget (wall-clock, evaluation and iteration limits);
+            overrides time_limit. Checked once per generation (pop_size evaluations).
+
+    Returns:
+        best_solution: best Solution found.
+        best_obj: objective value of best_solution.
+        history: list of (elapsed_time, best_obj) on each improvement.
+    """
+    budget = start_budget(budget, time_limit)
+    rng = np.random.default_rng(random.getrandbits(64))
+    n = problem.n
+    values = np.asarray(problem.values, dtype=np.int64)
+    rows = np.arange(pop_size)
+    columns = np.arange(n)
+
+    if init == 'random':
+        population = rng.integers(0, 2, size=(pop_size, n), dtype=np.uint8)
+    else:
+        starts = initial_population(problem, pop_size, init)
+        population = np.vstack([np.frombuffer(s.bits, dtype=np.uint8) for s in starts])
+    fitness = np.abs(population @ values - problem.target)
+    k = int(np.argmin(fitness))
+    best_row = population[k].copy()
+    best_obj = int(fitness[k])
+
+    history = budget.history((0.0, best_obj))
+
+    generations = 0
+    while best_obj > 0:
+        if budget.exhausted(pop_size * (generations + 1), generations):
+            break
+
+        # Binary tournaments for both parents of every child at once
+        contenders = rng.integers(pop_size, size=(4, pop_size))
+        first = np.where(fitness[contenders[0]] < fitness[contenders[1]], contenders[0], contenders[1])
+        second = np.where(fitness[contenders[2]] < fitness[contenders[3]], contenders[2], contenders[3])
+
+        # Crossover: mask[i, j] says whether child i takes gene j from its first parent
+        if crossover == 'one_point':
+            points = rng.integers(1, max(n, 2), size=pop_size)
+            mask = columns < points[:, None]
+        elif crossover == 'uniform':
+            mask = rng.integers(0, 2, size=(pop_size, n), dtype=np.uint8).view(bool)
+        else:
+            mask = np.ones((pop_size, n), dtype=bool)
+        children = np.where(mask, population[first], population[second])
+
+        # Mutation: one flip or one swap per child
+        if mutation == 'flip':
+            children[rows, rng.integers(n, size=pop_size)] ^= 1
+        elif mutation == 'swap':
+            i = rng.integers(n, size=pop_size)
+            j = rng.integers(n, size=pop_size)
+            children[rows, i], children[rows, j] = children[rows, j], children[rows, i]
+
+        # Elitism: the best individual survives unchanged
+        children[0] = best_row
+        population = children
+        fitness = np.abs(population @ values - problem.target)
+        generations += 1
+
+        k = int(np.argmin(fitness))
+        if fitness[k] < best_obj:
+            best_row = population[k].copy()
+            best_obj = int(fitness[k])
+            history.append((budget.elapsed(), best_obj))
+
+    # Every generation evaluates and replaces the whole population
+    evaluations = pop_size * (generations + 1)
+    metrics.count(evaluations=evaluations, moves_proposed=pop_size * generations,
+                  moves_accepted=pop_size * generations, iterations=generations)
+    return problem.solution(best_row.tobytes()), best_obj, history
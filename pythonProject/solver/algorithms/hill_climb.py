@@ -1,78 +1,112 @@
-import time
 import random
-from typing import Callable, List, Tuple
-from solver.problem import SubsetSum
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from solver import metrics
+from solver.budget import Budget, start_budget
+from solver.problem import SubsetSum, Solution
+from solver.neighborhood import FlipEvaluator
+from solver.index import FlipIndex
+from solver.construct import initial_solution
 
 
 def hill_climb(
     problem: SubsetSum,
-    neighborhood: Callable[[List[int]], List[List[int]]],
+    neighborhood: Callable[[Solution], Sequence[int]],
     time_limit: float = None,
-    random_choice: bool = False
-) -> Tuple[List[int], int, List[Tuple[float, int]]]:
+    random_choice: bool = False,
+    engine: str = 'scan',
+    init: str = 'random',
+    budget: Budget = None
+) -> Tuple[Solution, int, List[Tuple[float, int]]]:
     """
     Perform hill climbing on the Subset Sum problem.
 
     Args:
         problem: SubsetSum instance with values and target.
-        neighborhood: function to generate neighbors (flip or all).
+        neighborhood: function returning the moves to try (flip, all or swap pairs).
         time_limit: optional max runtime (seconds).
         random_choice: if True, pick a random improving neighbor; otherwise pick the best.
+        engine: 'scan' scores the neighborhood with NumPy; 'index' finds the best flip
+            by bisection in a sorted-value index (deterministic mode only, the
+            neighborhood argument is ignored since the index covers all flips).
+        init: starting solution construction ('random', 'greedy', 'kk' or 'rgreedy').
+        budget: optional Budget (wall-clock, evaluation and iteration limits);
+            overrides time_limit. Checked once per iteration.
 
     Returns:
         best_solution: bit vector of the best subset found.
         best_obj: objective value of best_solution.
         history: list of (elapsed_time, best_obj) on each improvement.
     """
-    start_time = time.time()
+    if engine == 'index' and random_choice:
+        raise ValueError("The 'index' engine supports only deterministic hill climbing")
+
+    budget = start_budget(budget, time_limit)
     # Initialize current and best solutions
-    current = problem.random_solution()
-    current_obj = problem.objective(current)
-    best = current.copy()
+    current = initial_solution(problem, init)
+    if engine == 'index':
+        index = FlipIndex(current)
+    else:
+        evaluator = FlipEvaluator(current)
+    current_obj = current.objective
+    # Only improving moves are accepted, so the current solution is always the best
+    # one seen; it is returned at the end instead of being copied on every step
     best_obj = current_obj
 
-    history: List[Tuple[float, int]] = []
+    history = budget.history()
     history.append((0.0, best_obj))  # record initial state
 
+    # Work counters, reported to the metrics collector once at the end
+    evaluations = 0
+    iterations = 0
     while True:
-        # Stop if time limit is exceeded
-        if time_limit is not None and (time.time() - start_time) > time_limit:
-            break
-
-        # Generate neighboring solutions
-        raw_neighbors = neighborhood(current)
-        if not raw_neighbors:
-            break
-        # Handle case where single neighbor is returned as list of ints
-        if isinstance(raw_neighbors[0], int):
-            raw_neighbors = [raw_neighbors]  # type: ignore
-
-        # Evaluate all neighbors and collect those that improve
-        improvements: List[Tuple[List[int], int]] = []
-        for nbr in raw_neighbors:
-            obj = problem.objective(nbr)
-            if obj < current_obj:
-                improvements.append((nbr, obj))
-
-        # No improvement possible, exit loop
-        if not improvements:
+        # Stop once the budget is spent
+        if budget.exhausted(evaluations, iterations):
             break
+        iterations += 1
 
-        # Select next solution: random or best
-        if random_choice:
-            next_sol, next_obj = random.choice(improvements)
+        if engine == 'index':
+            # Steepest descent step answered by the index in O(log n)
+            found = index.best_flip()
+            evaluations += 1
+            if found is None or found[1] >= current_obj:
+                break
+            index.flip(found[0])
+            current_obj = found[1]
         else:
-            next_sol, next_obj = min(improvements, key=lambda x: x[1])
+            # Generate neighboring moves (indices of bits to flip or swap pairs)
+            moves = neighborhood(current)
+            if len(moves) == 0:
+                break
 
-        current, current_obj = next_sol, next_obj
+            # Score all moves in one array operation and find those that improve
+            objs = evaluator.score(moves)
+            evaluations += len(moves)
+            improving = np.flatnonzero(objs < current_obj)
 
-        # Update best if improved and record time
-        if current_obj < best_obj:
-            best = current.copy()
-            best_obj = current_obj
-            elapsed = time.time() - start_time
-            history.append((elapsed, best_obj))
-            if best_obj == 0:
+            # No improvement possible, exit loop
+            if improving.size == 0:
                 break
 
-    return best, best_obj, history
+            # Select next move: random among improving or best
+            if random_choice:
+                k = improving[random.randrange(improving.size)]
+            else:
+                k = np.argmin(objs)
+
+            evaluator.apply(moves[k])
+            current_obj = int(objs[k])
+
+        # Record the improvement
+        best_obj = current_obj
+        history.append((budget.elapsed(), best_obj))
+        if best_obj == 0:
+            break
+
+    # Every iteration but the last (which found no improving move) accepted one move
+    moves_accepted = history.recorded - 1
+    metrics.count(evaluations=evaluations, moves_proposed=evaluations,
+                  moves_accepted=moves_accepted, iterations=iterations)
+    return current, best_obj, history
@@ -0,0 +1,267 @@
+import heapq
+import math
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from solver import metrics
+from solver.budget import Budget, start_budget
+from solver.problem import SubsetSum, Solution
+
+# Bytes per enumerated half-subset: int64 sum, int64 mask and the argsort index
+BYTES_PER_SUBSET = 24
+# Rows of the left half merged per vectorized step (also the budget check granularity)
+CHUNK = 1 << 16
+# Bytes per quarter subset of the ss variant: a (sum, mask) tuple of Python ints and its list slot
+BYTES_PER_QUARTER_SUM = 152
+# Bytes per heap entry of the ss variant: one (key, i, j) tuple per element of an outer quarter
+BYTES_PER_HEAP_ENTRY = 136
+
+
+def mitm_memory_estimate(problem: SubsetSum) -> int:
+    """Estimated peak memory (in bytes) of the Horowitz–Sahni variant."""
+    half = problem.n // 2
+    return (2 ** half + 2 ** (problem.n - half)) * BYTES_PER_SUBSET
+
+
+def ss_memory_estimate(problem: SubsetSum) -> int:
+    """Estimated peak memory (in bytes) of the Schroeppel–Shamir variant."""
+    cuts = _quarter_cuts(problem.n)
+    sizes = [2 ** (hi - lo) for lo, hi in zip(cuts, cuts[1:])]
+    return sum(sizes) * BYTES_PER_QUARTER_SUM + (sizes[0] + sizes[3]) * BYTES_PER_HEAP_ENTRY
+
+
+def meet_in_the_middle(
+    problem: SubsetSum,
+    time_limit: float = None,
+    variant: str = 'hs',
+    max_memory_mb: float = 1024,
+    budget: Budget = None
+) -> Tuple[Solution, int, List[Tuple[float, int]]]:
+    """
+    Exact meet-in-the-middle search for the Subset Sum problem.
+
+    The values are split into halves and all subset sums of each half are
+    enumerated; the best pair (a from the left, b from the right) with a + b
+    closest to the target is found by merging the sorted lists.
+
+    - 'hs' (Horowitz–Sahni): both halves are materialized as NumPy arrays,
+      the right one sorted, and every left sum is matched by binary search.
+      O(2^(n/2)) time and memory.
+    - 'ss' (Schroeppel–Shamir): the values are split into quarters and the
+      sorted left (A+B) and right (C+D) sum lists are produced lazily by two
+      heaps, so only O(2^(n/4)) entries are kept in memory at a time.
+
+    Values may be negative or arbitrarily large (the 'hs' variant needs sums
+    to fit into int64).
+
+    Args:
+        problem: SubsetSum instance containing the values list and target sum.
+        time_limit: Optional max runtime (in seconds) before early termination.
+        variant: 'hs' or 'ss'.
+        max_memory_mb: Refuse to run if the variant's estimated memory exceeds this many MB.
+        budget: Optional Budget overriding time_limit. 'hs' checks it per chunk
+            of CHUNK left sums (two candidate pairs each); 'ss' checks it while
+            enumerating the quarters and counts one evaluation and iteration
+            per two-pointer step.
+
+    Returns:
+        best_solution: Solution representing the best subset found.
+        best_obj: int best objective value |sum(selected) - target|.
+        history: List of (elapsed_time, best_obj) tuples at each improvement.
+
+    Raises:
+        ValueError: on an unknown variant, when the variant would not fit into
+            memory, or when 'hs' would not fit into int64.
+    """
+    limit = max_memory_mb * 2 ** 20
+    # The ss variant is only suggested where it would pass its own memory check
+    hint = '; use the ss variant' if ss_memory_estimate(problem) <= limit else ''
+    if variant == 'hs':
+        estimate = mitm_memory_estimate(problem)
+        if estimate > limit:
+            raise ValueError(
+                f"The hs variant would need about {_format_bytes(estimate)} "
+                f"(limit {max_memory_mb:.0f} MB){hint}")
+        if sum(abs(int(v)) for v in problem.values) >= 2 ** 62:
+            raise ValueError(f"The hs variant requires sums that fit into int64{hint}")
+        search = _horowitz_sahni
+    elif variant == 'ss':
+        estimate = ss_memory_estimate(problem)
+        if estimate > limit:
+            raise ValueError(
+                f"The ss variant would need about {_format_bytes(estimate)} "
+                f"(limit {max_memory_mb:.0f} MB)")
+        search = _schroeppel_shamir
+    else:
+        raise ValueError(f"Unknown meet-in-the-middle variant: {variant}")
+
+    budget = start_budget(budget, time_limit)
+    values = [int(v) for v in problem.values]
+    history = budget.history()
+    mask, best_obj = search(values, problem.target, history, budget)
+
+    bits = bytearray(problem.n)
+    for i in range(problem.n):
+        bits[i] = (mask >> i) & 1
+    return problem.solution(bits), best_obj, history
+
+
+def _format_bytes(size: int) -> str:
+    # Huge estimates are shown as a power of two (they overflow a float)
+    return f"{size // 2 ** 20} MB" if size < 2 ** 60 else f"2^{size.bit_length() - 1} bytes"
+
+
+def _quarter_cuts(n: int) -> List[int]:
+    # Boundaries of the four quarters of the ss variant
+    return [0, n // 4, n // 2, n // 2 + (n - n // 2) // 2, n]
+
+
+def _horowitz_sahni(
+    values: Sequence[int],
+    target: int,
+    history: List[Tuple[float, int]],
+    budget: Budget
+) -> Tuple[int, int]:
+    half = len(values) // 2
+    with metrics.phase('enumerate'):
+        left_sums, left_masks = _half_sums(values[:half])
+        right_sums, right_masks = _half_sums(values[half:])
+        order = np.argsort(right_sums, kind='stable')
+        right_sums, right_masks = right_sums[order], right_masks[order]
+    last = len(right_sums) - 1
+
+    best_obj = math.inf
+    best_mask = 0
+    chunks = 0
+    evaluations = 0
+    for lo in range(0, len(left_sums), CHUNK):
+        # Stop once the budget is spent (the first chunk always runs)
+        if lo and budget.exhausted(evaluations, chunks):
+            break
+
+        sums = left_sums[lo:lo + CHUNK]
+        # The right partner closest to target - a is at the insertion point or just before it
+        pos = np.searchsorted(right_sums, target - sums)
+        above = np.minimum(pos, last)
+        below = np.maximum(pos - 1, 0)
+        obj_above = np.abs(sums + right_sums[above] - target)
+        obj_below = np.abs(sums + right_sums[below] - target)
+        partner = np.where(obj_below < obj_above, below, above)
+        objs = np.minimum(obj_below, obj_above)
+        chunks += 1
+        # Two candidate pairs scored per left sum
+        evaluations += 2 * len(sums)
+
+        k = int(np.argmin(objs))
+        if objs[k] < best_obj:
+            best_obj = int(objs[k])
+            best_mask = int(left_masks[lo + k]) | (int(right_masks[partner[k]]) << half)
+            history.append((budget.elapsed(), best_obj))
+            if best_obj == 0:
+                break
+
+    metrics.count(evaluations=evaluations, iterations=chunks)
+    return best_mask, best_obj
+
+
+def _half_sums(values: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    # All 2^k subset sums of the given values with their bit masks, built by doubling
+    sums = np.zeros(1, dtype=np.int64)
+    masks = np.zeros(1, dtype=np.int64)
+    for j, v in enumerate(values):
+        sums = np.concatenate((sums, sums + v))
+        masks = np.concatenate((masks, masks | (1 << j)))
+    return sums, masks
+
+
+def _schroeppel_shamir(
+    values: Sequence[int],
+    target: int,
+    history: List[Tuple[float, int]],
+    budget: Budget
+) -> Tuple[int, int]:
+    cuts = _quarter_cuts(len(values))
+    quarters = []
+    with metrics.phase('enumerate'):
+        for q in range(4):
+            quarter = _sorted_sums(values[cuts[q]:cuts[q + 1]], cuts[q], budget)
+            if quarter is None:
+                # The budget ran out before any pair was formed: report the empty subset
+                history.append((budget.elapsed(), abs(target)))
+                metrics.count(evaluations=1)
+                return 0, abs(target)
+            quarters.append(quarter)
+
+    # Left sums ascending, right sums descending (negated sums in a min-heap)
+    left = _pair_sums(quarters[0], quarters[1], 1)
+    right = _pair_sums(quarters[3], quarters[2], -1)
+
+    best_obj = math.inf
+    best_mask = 0
+    steps = 0
+    next_check = 0
+    a, a_mask = next(left, (None, 0))
+    b, b_mask = next(right, (None, 0))
+    while a is not None and b is not None:
+        # Check the budget only at the end of each allowance of steps
+        if steps >= next_check:
+            if budget.exhausted(steps, steps):
+                break
+            next_check = steps + budget.allowance(steps, steps)
+        steps += 1
+
+        total = a + b
+        if abs(total - target) < best_obj:
+            best_obj = abs(total - target)
+            best_mask = a_mask | b_mask
+            history.append((budget.elapsed(), best_obj))
+            if best_obj == 0:
+                break
+
+        # Classic two-pointer step: raise the left sum if too small, lower the right one otherwise
+        if total < target:
+            a, a_mask = next(left, (None, 0))
+        else:
+            b, b_mask = next(right, (None, 0))
+
+    # One pair sum is evaluated per two-pointer step
+    metrics.count(evaluations=steps, iterations=steps)
+    return best_mask, best_obj
+
+
+def _sorted_sums(values: Sequence[int], offset: int, budget: Budget) -> Optional[List[Tuple[int, int]]]:
+    # All subset sums of one quarter, sorted, with masks shifted to the quarter's position;
+    # built in chunks of CHUNK entries between budget checks (None once the budget is spent)
+    sums = [(0, 0)]
+    for j, v in enumerate(values):
+        bit = 1 << (offset + j)
+        size = len(sums)
+        for lo in range(0, size, CHUNK):
+            if budget.exhausted():
+                return None
+            sums += [(s + v, m | bit) for s, m in sums[lo:min(lo + CHUNK, size)]]
+    sums.sort()
+    return sums
+
+
+def _pair_sums(
+    outer: List[Tuple[int, int]],
+    inner: List[Tuple[int, int]],
+    direction: int
+) -> Iterator[Tuple[int, int]]:
+    # Yield x + y over all pairs in ascending (direction=1) or descending (-1) order,
+    # keeping one heap entry per element of `outer`
+    if direction < 0:
+        outer, inner = outer[::-1], inner[::-1]
+    heap = [(direction * (x + inner[0][0]), i, 0) for i, (x, _) in enumerate(outer)]
+    heapq.heapify(heap)
+    while heap:
+        key, i, j = heap[0]
+        x, x_mask = outer[i]
+        y, y_mask = inner[j]
+        yield x + y, x_mask | y_mask
+        if j + 1 < len(inner):
+            heapq.heapreplace(heap, (direction * (x + inner[j + 1][0]), i, j + 1))
+        else:
+            heapq.heappop(heap)
@@ -0,0 +1,126 @@
+import random
+import time
+import multiprocessing
+from typing import Callable, List, Optional, Tuple
+
+from solver import metrics
+from solver.budget import Budget, start_budget
+from solver.problem import SubsetSum, Solution
+
+
+def multi_start(
+    problem: SubsetSum,
+    algorithm: Callable[..., Tuple[Solution, int, list]],
+    chains: int,
+    workers: int = 1,
+    seed: int = None,
+    time_limit: float = None,
+    budget: Budget = None,
+    **params
+) -> Tuple[Solution, int, List[Tuple[float, int]]]:
+    """
+    Run K independent chains of a trajectory algorithm and keep the best result.
+
+    Each chain calls algorithm(problem, budget=..., **params) from its own
+    random starting point, with the global random module reseeded from a
+    per-chain seed derived from `seed`, so runs are reproducible. Chains are
+    spread over a multiprocessing pool; as soon as one of them returns a
+    perfect (0) solution, or one reaching the budget's target_obj, the pool is
+    terminated and the remaining chains are cancelled; in-process chains also
+    honour the budget's stop token, while chains in worker processes report
+    their improvements when they finish. The time limit is global: a chain only gets the time left
+    until the shared deadline. Evaluation and iteration limits apply to each
+    chain separately, so a seeded count-limited run is reproducible whatever
+    the number of workers. The work counters of every finished chain are
+    merged into the active metrics collector, and each chain counts as a restart.
+
+    Args:
+        problem: SubsetSum instance.
+        algorithm: module-level algorithm function (hill_climb, tabu_search, ...).
+        chains: number of independent chains (K).
+        workers: number of worker processes (1 = run chains in this process).
+        seed: base seed; if None, chain seeds are drawn from the global random module.
+        time_limit: optional max runtime (in seconds) for the whole run.
+        budget: optional Budget; its time limit is global, its evaluation and
+            iteration limits are per chain (overrides time_limit).
+        **params: extra keyword arguments passed to every chain.
+
+    Returns:
+        best_solution: best Solution over all chains.
+        best_obj: its objective value.
+        history: merged (elapsed_time, best_obj) timeline of global improvements.
+    """
+    start_time = time.time()
+    budget = start_budget(budget, time_limit)
+    remaining = budget.remaining_time()
+    deadline = start_time + remaining if remaining is not None else None
+    rng = random.Random(seed) if seed is not None else random
+    tasks = [
+        (algorithm, problem, params, deadline, budget.max_evals, budget.max_iters, budget.target_obj,
+         rng.getrandbits(64))
+        for _ in range(chains)
+    ]
+    stop_obj = budget.target_obj if budget.target_obj is not None else 0
+
+    best_bits: Optional[bytes] = None
+    best_obj = None
+    events: List[Tuple[float, int]] = []
+
+    def collect(result) -> bool:
+        # Fold one chain's result into the global best; True once it is good enough
+        nonlocal best_bits, best_obj
+        if result is None:
+            return False
+        bits, obj, chain_events, (counters, phases) = result
+        metrics.current().merge(counters, phases)
+        metrics.count(restarts=1)
+        events.extend(chain_events)
+        if best_obj is None or obj < best_obj:
+            best_bits, best_obj = bits, obj
+        return best_obj <= stop_obj
+
+    if workers <= 1:
+        for task in tasks:
+            if collect(_run_chain(task, budget.stop_event)) or budget.stop_event.is_set():
+                break
+    else:
+        pool = multiprocessing.Pool(workers)
+        try:
+            for result in pool.imap_unordered(_run_chain, tasks):
+                if collect(result):
+                    break
+        finally:
+            # Cancels queued chains and stops running ones after a good enough hit
+            pool.terminate()
+            pool.join()
+
+    # Merge chain improvements (absolute times) into one running-best timeline
+    history = budget.history()
+    for t, obj in sorted(events):
+        if history.last is None or obj < history.last[1]:
+            history.append((t - start_time, obj))
+
+    if best_bits is None:
+        # No chain got any time: fall back to the empty subset
+        empty = problem.solution(bytes(problem.n))
+        return empty, empty.objective, history
+    return problem.solution(best_bits), best_obj, history
+
+
+def _run_chain(task, stop_event=None) -> Optional[Tuple[bytes, int, List[Tuple[float, int]], tuple]]:
+    # Run one chain with its own seed; history times are converted to absolute time.
+    # The chain's metrics are collected separately, so they can cross process boundaries
+    algorithm, problem, params, deadline, max_evals, max_iters, target_obj, chain_seed = task
+    chain_start = time.time()
+    time_limit = None
+    if deadline is not None:
+        time_limit = deadline - chain_start
+        if time_limit <= 0:
+            return None
+    random.seed(chain_seed)
+    with metrics.collect() as chain_metrics:
+        chain_budget = Budget(time_limit=time_limit, max_evals=max_evals, max_iters=max_iters,
+                              target_obj=target_obj, stop_event=stop_event)
+        best, best_obj, history = algorithm(problem, budget=chain_budget, **params)
+    events = [(chain_start + t, obj) for t, obj, *_ in history]
+    return bytes(best.bits), best_obj, events, (chain_metrics.counters, chain_metrics.phases)
@@ -0,0 +1,120 @@
+import random
+from typing import List, Tuple
+
+import numpy as np
+
+from solver import metrics
+from solver.budget import Budget, start_budget
+from solver.problem import SubsetSum, Solution
+from solver.construct import initial_population
+
+
+def parallel_tempering(
+    problem: SubsetSum,
+    replicas: int = 16,
+    t_min: float = 1.0,
+    t_max: float = 1000.0,
+    swap_interval: int = 50,
+    time_limit: float = None,
+    init: str = 'random',
+    budget: Budget = None
+) -> Tuple[Solution, int, List[Tuple[float, int]]]:
+    """
+    Replica-exchange (parallel tempering) annealing for the Subset Sum problem.
+
+    R replicas run Metropolis single-flip moves in lockstep at fixed
+    temperatures spaced geometrically between t_min and t_max. All replicas
+    advance together: one step draws one flip per replica and updates every
+    running sum with a single NumPy operation (random numbers are drawn for
+    swap_interval steps at a time). Every swap_interval steps neighboring
+    temperatures are exchanged with the Metropolis criterion
+    min(1, exp((1/T_k - 1/T_k+1) * (E_k - E_k+1))), so good states found at
+    high temperature drift down to the cold end of the ladder.
+
+    Args:
+        problem: SubsetSum instance containing the values array and target sum.
+        replicas: number of replicas (R), one per temperature of the ladder.
+        t_min: lowest temperature of the ladder.
+        t_max: highest temperature of the ladder.
+        swap_interval: lockstep steps between exchange attempts (also the
+            budget check granularity).
+        time_limit: optional maximum runtime in seconds before stopping.
+        init: starting states of the replicas ('random', 'greedy', 'kk' or
+            'rgreedy'; see construct.initial_population).
+        budget: optional Budget (wall-clock, evaluation and iteration limits);
+            overrides time_limit. One lockstep step is one iteration and R evaluations.
+
+    Returns:
+        best_solution: best Solution seen by any replica.
+        best_obj: its objective value.
+        history: list of (elapsed_time, best_obj) tuples at each improvement.
+    """
+    budget = start_budget(budget, time_limit)
+    rng = np.random.default_rng(random.getrandbits(64))
+    n = problem.n
+    target = problem.target
+    values = np.asarray(problem.values, dtype=np.int64)
+    rows = np.arange(replicas)
+
+    ladder = np.geomspace(t_min, t_max, replicas) if replicas > 1 else np.array([t_min])
+    # replica_at[k] is the replica currently holding ladder temperature k
+    replica_at = np.arange(replicas)
+    temps = ladder.copy()
+
+    if init == 'random':
+        bits = rng.integers(0, 2, size=(replicas, n), dtype=np.uint8)
+    else:
+        starts = initial_population(problem, replicas, init)
+        bits = np.vstack([np.frombuffer(s.bits, dtype=np.uint8) for s in starts])
+    totals = bits @ values
+    objs = np.abs(totals - target)
+
+    k = int(np.argmin(objs))
+    best_row = bits[k].copy()
+    best_obj = int(objs[k])
+    history = budget.history((0.0, best_obj))
+
+    # Work counters, reported to the metrics collector once at the end
+    steps = 0
+    accepted = 0
+    while best_obj > 0 and n > 0:
+        # Check the budget once per block of lockstep steps; the last block is cut to the limits
+        if budget.exhausted(replicas * steps, steps):
+            break
+        block = min(swap_interval, budget.allowance(replicas * steps, steps, evals_per_iter=replicas))
+
+        flips = rng.integers(n, size=(block, replicas))
+        draws = rng.random((block, replicas))
+        for step in range(block):
+            idx = flips[step]
+            # One proposed flip per replica, evaluated from the running sums
+            proposed = totals + np.where(bits[rows, idx], -values[idx], values[idx])
+            proposed_obj = np.abs(proposed - target)
+            delta = proposed_obj - objs
+            accept = (delta <= 0) | (draws[step] < np.exp(-np.maximum(delta, 0) / temps))
+
+            bits[rows[accept], idx[accept]] ^= 1
+            accepted += int(np.count_nonzero(accept))
+            totals = np.where(accept, proposed, totals)
+            objs = np.where(accept, proposed_obj, objs)
+
+            k = int(np.argmin(objs))
+            if objs[k] < best_obj:
+                best_row = bits[k].copy()
+                best_obj = int(objs[k])
+                history.append((budget.elapsed(), best_obj))
+                if best_obj == 0:
+                    break
+        steps += step + 1
+
+        # Metropolis exchange between neighboring temperatures
+        for pos in range(replicas - 1):
+            a, b = replica_at[pos], replica_at[pos + 1]
+            exponent = (1 / ladder[pos] - 1 / ladder[pos + 1]) * (objs[a] - objs[b])
+            if exponent >= 0 or random.random() < np.exp(exponent):
+                replica_at[pos], replica_at[pos + 1] = b, a
+        temps[replica_at] = ladder
+
+    metrics.count(evaluations=replicas * steps, moves_proposed=replicas * steps,
+                  moves_accepted=accepted, iterations=steps)
+    return problem.solution(best_row.tobytes()), best_obj, history
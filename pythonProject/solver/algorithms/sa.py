@@ -1,71 +1,116 @@
-import time
 import math
 import random
-from typing import Callable, List, Tuple
-from solver.problem import SubsetSum
+from typing import Callable, List, Sequence, Tuple
+from solver import metrics
+from solver.budget import Budget, start_budget
+from solver.problem import SubsetSum, Solution
+from solver.neighborhood import move_objective, apply_move
+from solver.construct import initial_solution
+
+# Adaptive schedule: random moves sampled to calibrate the starting temperature
+CALIBRATION_MOVES = 200
+# Adaptive schedule: target acceptance rate of worsening moves at the start
+INITIAL_ACCEPTANCE = 0.8
+# Adaptive schedule: final temperature as a fraction of the starting one
+FINAL_RATIO = 1e-4
+# Adaptive schedule: steps per window (clock check, temperature update, acceptance rate)
+WINDOW = 256
+# Adaptive schedule: reheat after this many windows without improvement at low acceptance
+STALL_WINDOWS = 50
+MIN_ACCEPTANCE = 0.01
+# Adaptive schedule: each reheat starts from this fraction of the previous starting temperature
+REHEAT_FACTOR = 0.5
 
 
 def simulated_annealing(
     problem: SubsetSum,
-    neighborhood: Callable[[List[int]], List[int]],
+    neighborhood: Callable[[Solution], Sequence[int]],
     schedule: str = 'exponential',
     time_limit: float = None,
     initial_temp: float = 100.0,
     alpha: float = 0.95,
-    min_temp: float = 1e-3
-) -> Tuple[List[int], int, List[Tuple[float, int]]]:
+    min_temp: float = 1e-3,
+    init: str = 'random',
+    budget: Budget = None
+) -> Tuple[Solution, int, List[Tuple[float, int]]]:
     """
     Perform simulated annealing to minimize |sum(selected) - target| for Subset Sum.
 
     Args:
         problem: SubsetSum instance containing the values array and target sum.
-        neighborhood: function generating one neighbor solution from current state.
-        schedule: temperature update scheme, either 'exponential' or 'linear'.
+        neighborhood: function proposing moves (bit indices or swap pairs); one of them is
+            picked at random.
+        schedule: temperature update scheme, 'exponential', 'linear' or 'adaptive'.
+            'adaptive' ignores initial_temp, alpha and min_temp: the starting
+            temperature is calibrated from sampled moves and cooling is spread
+            over the whole budget (see _adaptive_annealing).
         time_limit: optional maximum runtime in seconds before stopping.
         initial_temp: starting temperature for annealing process.
         alpha: cooling factor (multiplier for exponential) or decrement for linear.
         min_temp: threshold temperature to end the annealing loop.
+        init: starting solution construction ('random', 'greedy', 'kk' or 'rgreedy').
+        budget: optional Budget (wall-clock, evaluation and iteration limits);
+            overrides time_limit. The adaptive schedule needs at least one limit.
+            The clock is read once per block of steps (see Budget.allowance).
 
     Returns:
         best_solution: bit list representing the best subset found.
         best_obj: integer objective value |sum(current) - target| of best_solution.
         history: list of (elapsed_time, best_obj) tuples at each improvement.
+
+    Raises:
+        ValueError: if the adaptive schedule is requested with an unlimited budget.
     """
-    start_time = time.time()
+    budget = start_budget(budget, time_limit)
+    if schedule == 'adaptive':
+        if budget.progress() is None:
+            raise ValueError("The adaptive SA schedule requires a time, evaluation or iteration limit")
+        return _adaptive_annealing(problem, neighborhood, budget, init)
 
-    # Initialize with a random starting solution
-    current = problem.random_solution()
-    current_obj = problem.objective(current)
+    # Initialize with a random or constructed starting solution
+    current = initial_solution(problem, init)
+    current_obj = current.objective
     best = current.copy()
     best_obj = current_obj
     temp = initial_temp
 
     # Record improvement history, starting with initial state
-    history: List[Tuple[float, int]] = [(0.0, best_obj)]
+    history = budget.history((0.0, best_obj))
+
+    # Work counters, reported to the metrics collector once at the end
+    steps = 0
+    accepted = 0
+    next_check = 0
 
     # Main annealing loop: continue while temperature remains above minimum
     while temp > min_temp:
-        # Check and enforce time limit
-        if time_limit is not None and (time.time() - start_time) > time_limit:
-            break
+        # Check the budget only at the end of each allowance of steps
+        if steps >= next_check:
+            if budget.exhausted(steps, steps):
+                break
+            next_check = steps + budget.allowance(steps, steps)
 
-        # Generate a new candidate by flipping a bit (or other neighborhood move)
-        neighbor = neighborhood(current)
-        neighbor_obj = problem.objective(neighbor)
+        # Propose a move and evaluate it in O(1) without copying the solution
+        moves = neighborhood(current)
+        if len(moves) == 0:
+            break
+        move = random.choice(moves)
+        neighbor_obj = move_objective(current, move)
+        steps += 1
 
         # Calculate change in objective (energy difference)
         delta = neighbor_obj - current_obj
         # Always accept improvement; accept worse with probability exp(-delta/temp)
         if delta < 0 or random.random() < math.exp(-delta / temp):
-            current = neighbor
+            apply_move(current, move)
             current_obj = neighbor_obj
+            accepted += 1
 
             # If this is the best solution so far, record it
             if current_obj < best_obj:
                 best = current.copy()
                 best_obj = current_obj
-                elapsed = time.time() - start_time
-                history.append((elapsed, best_obj))
+                history.append((budget.elapsed(), best_obj))
 
                 # Early exit if perfect match found
                 if best_obj == 0:
@@ -79,4 +124,101 @@ def simulated_annealing(
         else:
             temp *= alpha
 
+    metrics.count(evaluations=steps, moves_proposed=steps, moves_accepted=accepted, iterations=steps)
+    return best, best_obj, history
+
+
+def _adaptive_annealing(
+    problem: SubsetSum,
+    neighborhood: Callable[[Solution], Sequence[int]],
+    budget: Budget,
+    init: str
+) -> Tuple[Solution, int, List[Tuple[float, int]]]:
+    """
+    Self-calibrating, budget-based annealing.
+
+    The starting temperature T0 is chosen so that an average worsening move
+    from the initial solution is accepted with probability INITIAL_ACCEPTANCE.
+    The temperature then falls geometrically with the used fraction of the
+    budget (time, evaluations or iterations, whichever runs out first),
+    reaching T0 * FINAL_RATIO exactly when the budget is spent, and is
+    recomputed once per WINDOW steps. When the acceptance rate of a window
+    drops below MIN_ACCEPTANCE and the best solution has not improved for
+    STALL_WINDOWS windows, the chain is reheated: a new cooling phase starts at
+    REHEAT_FACTOR times the previous starting temperature and again ends when
+    the budget is spent.
+    """
+    current = initial_solution(problem, init)
+    current_obj = current.objective
+    best = current.copy()
+    best_obj = current_obj
+    history = budget.history((0.0, best_obj))
+
+    # Calibrate T0 from the worsening moves among a sample of random proposals
+    worse = []
+    calibration = 0
+    for _ in range(CALIBRATION_MOVES):
+        moves = neighborhood(current)
+        if len(moves) == 0:
+            break
+        delta = move_objective(current, random.choice(moves)) - current_obj
+        calibration += 1
+        if delta > 0:
+            worse.append(delta)
+    phase_temp = -(sum(worse) / len(worse)) / math.log(INITIAL_ACCEPTANCE) if worse else 1.0
+    final_temp = phase_temp * FINAL_RATIO
+    phase_start = 0.0
+    temp = phase_temp
+
+    accepted = 0
+    total_accepted = 0
+    reheats = 0
+    steps = 0
+    stalled_windows = 0
+    next_check = 0
+    while best_obj > 0:
+        # Check the budget only at the end of each allowance of steps
+        if steps >= next_check:
+            if budget.exhausted(calibration + steps, steps):
+                break
+            next_check = steps + budget.allowance(calibration + steps, steps)
+
+        if steps and steps % WINDOW == 0:
+            progress = budget.progress(calibration + steps, steps)
+
+            # Reheat when the chain is frozen and no longer improving
+            stalled_windows += 1
+            if accepted < MIN_ACCEPTANCE * WINDOW and stalled_windows >= STALL_WINDOWS:
+                phase_temp = max(phase_temp * REHEAT_FACTOR, final_temp)
+                phase_start = progress
+                stalled_windows = 0
+                reheats += 1
+            total_accepted += accepted
+            accepted = 0
+
+            # Geometric cooling from phase_temp down to final_temp when the budget is spent
+            remaining = 1.0 - phase_start
+            fraction = (progress - phase_start) / remaining if remaining > 0 else 1.0
+            temp = phase_temp * (final_temp / phase_temp) ** fraction
+
+        moves = neighborhood(current)
+        if len(moves) == 0:
+            break
+        move = random.choice(moves)
+        neighbor_obj = move_objective(current, move)
+        steps += 1
+        delta = neighbor_obj - current_obj
+        if delta <= 0 or random.random() < math.exp(-delta / temp):
+            apply_move(current, move)
+            current_obj = neighbor_obj
+            accepted += 1
+
+            if current_obj < best_obj:
+                best = current.copy()
+                best_obj = current_obj
+                stalled_windows = 0
+                history.append((budget.elapsed(), best_obj))
+
+    metrics.count(evaluations=calibration + steps, moves_proposed=steps,
+                  moves_accepted=total_accepted + accepted, iterations=steps, restarts=reheats)
     return best, best_obj, history
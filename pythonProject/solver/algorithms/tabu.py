@@ -1,92 +1,209 @@
-import time
-from typing import Callable, List, Tuple
-from solver.problem import SubsetSum
+import random
+from collections import deque
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from solver import metrics
+from solver.budget import Budget, start_budget
+from solver.problem import SubsetSum, Solution
+from solver.neighborhood import FlipEvaluator
+from solver.index import FlipIndex
+from solver.construct import initial_solution
+
+# Number of most recent visited states (Zobrist hashes) kept for cycle detection
+VISITED_LIMIT = 1 << 16
+# Iterations without a new best before a diversification phase starts
+STALL_ITERS = 1000
+# Length of a diversification phase in iterations
+DIVERSIFY_ITERS = 100
 
 
 def tabu_search(
     problem: SubsetSum,
-    neighborhood: Callable[[List[int]], List[List[int]]],
+    neighborhood: Callable[[Solution], Sequence[int]],
     tabu_size: int,
-    time_limit: float = None
-) -> Tuple[List[int], int, List[Tuple[float, int]]]:
+    time_limit: float = None,
+    engine: str = 'scan',
+    init: str = 'random',
+    budget: Budget = None
+) -> Tuple[Solution, int, List[Tuple[float, int]]]:
     """
     Tabu Search for the Subset Sum problem.
 
+    Short-term memory is a tenure array: tenure[i] is the iteration until
+    which flipping bit i is tabu, so the tabu test is O(1) (and vectorized
+    over the whole neighborhood). Every visited state is identified by an
+    incrementally maintained 64-bit Zobrist hash (XOR of one random key per
+    selected bit); a move leading back to one of the last VISITED_LIMIT states
+    is skipped unless every allowed move does. Long-term memory counts flips
+    per bit: after STALL_ITERS iterations without a new best, the search
+    spends DIVERSIFY_ITERS iterations preferring rarely flipped bits.
+    A move that beats the global best is always accepted (aspiration).
+
     Parameters:
     - problem: an instance of SubsetSum
-    - neighborhood: function that generates a list of neighbors (all_neighbors)
-    - tabu_size: maximum length of the tabu list (number of recent moves to forbid)
+    - neighborhood: function returning the moves to try (all_neighbors, or swap_neighbor
+      pairs; a swap is tabu if either of its bits is)
+    - tabu_size: tabu tenure (number of iterations a flipped bit stays forbidden)
     - time_limit: optional time limit in seconds
+    - engine: 'scan' scores the neighborhood with NumPy; 'index' finds the best
+      non-tabu flip by bisection in a sorted-value index (the neighborhood
+      argument is ignored since the index covers all flips)
+    - init: starting solution construction ('random', 'greedy', 'kk' or 'rgreedy')
+    - budget: optional Budget (wall-clock, evaluation and iteration limits);
+      overrides time_limit. Checked once per iteration
 
     Returns:
     - best_solution: the best bit-vector found
     - best_obj: the objective value of best_solution
     - history: list of (elapsed_time, best_obj) tuples tracking improvements
     """
-    start_time = time.time()
-
-    # Initialize with a random solution
-    current = problem.random_solution()
-    current_obj = problem.objective(current)
+    budget = start_budget(budget, time_limit)
+    n = problem.n
+
+    # Initialize with a random or constructed solution
+    current = initial_solution(problem, init)
+    if engine == 'index':
+        index = FlipIndex(current)
+    else:
+        evaluator = FlipEvaluator(current)
+    current_obj = current.objective
     best = current.copy()
     best_obj = current_obj
 
     # Record the initial state
-    history: List[Tuple[float, int]] = [(0.0, best_obj)]
-
-    # Tabu list stores the indices of bits that were last flipped
-    tabu_list: List[int] = []
-
-    while True:
-        # Stop if time limit exceeded
-        if time_limit is not None and (time.time() - start_time) > time_limit:
-            break
-
-        # Generate all neighbors of the current solution
-        neighbors = neighborhood(current)
-        if not neighbors:
+    history = budget.history((0.0, best_obj))
+
+    # Short-term memory: bit i is tabu while tenure[i] > iteration
+    tenure = np.zeros(n, dtype=np.int64)
+    # Long-term memory: number of times each bit has been flipped
+    freq = np.zeros(n, dtype=np.int64)
+    # Penalty scale for diversification, in objective units
+    scale = float(np.mean(problem.values)) if n else 0.0
+
+    # Zobrist hashing: the state hash is the XOR of the keys of the selected bits
+    keys = [random.getrandbits(64) for _ in range(n)]
+    state_hash = 0
+    for i, bit in enumerate(current.bits):
+        if bit:
+            state_hash ^= keys[i]
+    visited = {state_hash}
+    visited_order = deque([state_hash])
+
+    def next_hash(bits_to_flip) -> int:
+        # Hash of the state reached by flipping the given bits
+        h = state_hash
+        for i in bits_to_flip:
+            h ^= keys[i]
+        return h
+
+    iteration = 0
+    last_improvement = 0
+    diversify_until = 0
+    # Work counters, reported to the metrics collector once at the end
+    evaluations = 0
+    accepted = 0
+    diversifications = 0
+
+    while best_obj > 0:
+        # Stop once the budget is spent
+        if budget.exhausted(evaluations, iteration):
             break
 
-        candidate = None
-        candidate_obj = float('inf')
-        candidate_move = None
-
-        # Evaluate each neighbor, respecting the tabu list and aspiration criteria
-        for nbr in neighbors:
-            # Identify which bit was flipped to generate this neighbor
-            move_idx = next(i for i, (b1, b2) in enumerate(zip(current, nbr)) if b1 != b2)
-            obj = problem.objective(nbr)
-
-            # Aspiration: accept if it's better than the global best
-            if obj < best_obj:
-                candidate, candidate_obj, candidate_move = nbr, obj, move_idx
+        iteration += 1
+        # Start a diversification phase when the search has stagnated
+        if iteration - last_improvement > STALL_ITERS and iteration > diversify_until:
+            diversify_until = iteration + DIVERSIFY_ITERS
+            last_improvement = iteration
+            diversifications += 1
+        diversifying = iteration <= diversify_until
+
+        if engine == 'index':
+            freq_cap = freq.mean() if diversifying else None
+
+            def allowed(i, obj, check_visited=True):
+                # Aspiration overrides tabu status, cycle detection and diversification
+                if obj < best_obj:
+                    return True
+                if tenure[i] > iteration:
+                    return False
+                if freq_cap is not None and freq[i] > freq_cap:
+                    return False
+                return not check_visited or (state_hash ^ keys[i]) not in visited
+
+            found = index.best_flip(allowed)
+            evaluations += 1
+            if found is None:
+                found = index.best_flip(lambda i, obj: allowed(i, obj, check_visited=False))
+                evaluations += 1
+            # If no valid candidate found, terminate
+            if found is None:
                 break
-
-            # Otherwise, consider it only if move is not tabu and it's the best so far
-            if move_idx not in tabu_list and obj < candidate_obj:
-                candidate, candidate_obj, candidate_move = nbr, obj, move_idx
-
-        # If no valid candidate found, terminate
-        if candidate is None:
-            break
-
-        # Apply the chosen move
-        current = candidate
-        current_obj = candidate_obj
-
-        # Update tabu list (FIFO)
-        tabu_list.append(candidate_move)
-        if len(tabu_list) > tabu_size:
-            tabu_list.pop(0)
+            candidate_move, current_obj = found
+            index.flip(candidate_move)
+            flipped = [candidate_move]
+        else:
+            # Generate all moves (bit indices or swap pairs) around the current solution
+            moves = np.asarray(neighborhood(current))
+            if moves.size == 0:
+                break
+            # Bits touched by each move, as rows of a (moves, bits per move) array
+            touched = moves.reshape(len(moves), -1)
+
+            # Score all moves at once
+            objs = evaluator.score(moves)
+            evaluations += len(moves)
+            k = int(np.argmin(objs))
+
+            # Aspiration: the best move is accepted even if tabu when it beats the global best;
+            # otherwise take the best non-tabu move that does not revisit a recent state
+            if objs[k] >= best_obj:
+                ranked = objs.astype(np.float64)
+                if diversifying:
+                    ranked += scale * freq[touched].sum(axis=1) / iteration
+                ranked[(tenure[touched] > iteration).any(axis=1)] = np.inf
+                k = int(np.argmin(ranked))
+                # If no valid candidate found, terminate
+                if ranked[k] == np.inf:
+                    break
+                fallback = k
+                while next_hash(touched[k]) in visited:
+                    ranked[k] = np.inf
+                    k = int(np.argmin(ranked))
+                    if ranked[k] == np.inf:
+                        # Every allowed move revisits a state: take the best one anyway
+                        k = fallback
+                        break
+
+            # Apply the chosen move
+            flipped = touched[k].tolist()
+            evaluator.apply(flipped)
+            current_obj = int(objs[k])
+
+        accepted += 1
+
+        # Update short- and long-term memory and the state hash
+        for i in flipped:
+            tenure[i] = iteration + tabu_size
+            freq[i] += 1
+        state_hash = next_hash(flipped)
+        if state_hash not in visited:
+            visited.add(state_hash)
+            visited_order.append(state_hash)
+            if len(visited_order) > VISITED_LIMIT:
+                visited.discard(visited_order.popleft())
 
         # Update global best if improved
         if current_obj < best_obj:
             best = current.copy()
             best_obj = current_obj
-            elapsed = time.time() - start_time
-            history.append((elapsed, best_obj))
+            last_improvement = iteration
+            history.append((budget.elapsed(), best_obj))
             # Stop early if perfect solution found
             if best_obj == 0:
                 break
 
+    metrics.count(evaluations=evaluations, moves_proposed=evaluations, moves_accepted=accepted,
+                  iterations=iteration, restarts=diversifications)
     return best, best_obj, history
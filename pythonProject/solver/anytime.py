@@ -0,0 +1,93 @@
+import copy
+import queue
+import threading
+from typing import Callable, Iterator, Optional, Tuple
+
+from solver.budget import Budget
+from solver.problem import SubsetSum, Solution
+
+
+# Module providing the anytime (iterator) interface of the algorithms.
+#
+# Every algorithm records its improvements in the History its budget hands out
+# and checks the budget's stop token, so any of them can be driven as an
+# iterator without changes: the algorithm runs in a background thread, each
+# improvement is handed over as soon as it is recorded, and leaving the loop
+# early stops the algorithm at its next budget check.
+
+# Marks the end of the event stream
+_DONE = object()
+
+
+class AnytimeRun:
+    """
+    Iterate over the improvements of an algorithm while it runs.
+
+        run = AnytimeRun(tabu_search, problem, Budget(time_limit=10), neighborhood=flip_neighbor)
+        for elapsed, best_obj, *extra in run:
+            if best_obj <= 100:
+                break           # good enough: the search stops cooperatively
+        best, best_obj, history = run.result()
+
+    Parameters:
+    - algorithm: any function of solver.algorithms (called as
+      algorithm(problem, budget=..., **params))
+    - problem: SubsetSum instance
+    - budget: limits of the run (default: none); its target_obj and
+      keep_history apply, its stop token and on_improvement are replaced by
+      the run's own
+    - **params: further keyword arguments of the algorithm
+    """
+    def __init__(
+        self,
+        algorithm: Callable[..., Tuple[Solution, int, list]],
+        problem: SubsetSum,
+        budget: Optional[Budget] = None,
+        **params
+    ):
+        self._events: queue.Queue = queue.Queue()
+        self.budget = copy.copy(budget) if budget is not None else Budget()
+        self.budget.stop_event = threading.Event()
+        self.budget.on_improvement = self._events.put
+        self._finished = False
+        self._result = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, args=(algorithm, problem, params), daemon=True)
+        self._thread.start()
+
+    def _run(self, algorithm, problem, params) -> None:
+        try:
+            self._result = algorithm(problem, budget=self.budget, **params)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._events.put(_DONE)
+
+    def __iter__(self) -> Iterator[tuple]:
+        """Yield the (elapsed, best_obj, *extra) history entries as they are recorded."""
+        try:
+            while not self._finished:
+                event = self._events.get()
+                if event is _DONE:
+                    self._finished = True
+                else:
+                    yield event
+        finally:
+            # Leaving the loop early (break, exception) stops the algorithm
+            self.stop()
+
+    def stop(self) -> None:
+        """Ask the algorithm to stop at its next budget check."""
+        self.budget.stop()
+
+    def result(self) -> Tuple[Solution, int, list]:
+        """
+        Wait for the algorithm to return and give its (best_solution, best_obj, history).
+
+        Raises:
+        - whatever the algorithm raised
+        """
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
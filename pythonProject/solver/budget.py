@@ -0,0 +1,212 @@
+import copy
+import threading
+import time
+from typing import Callable, Optional
+
+
+# Module providing the stopping rule shared by all algorithms.
+#
+# A Budget combines a wall-clock limit with limits on objective evaluations and
+# iterations (any of them may be None = unlimited). The count limits make runs
+# reproducible and hardware-independent: with --seed and --max-evals two runs
+# do exactly the same work. The clock is read with time.perf_counter, and
+# only at check points; algorithms with cheap iterations (sa, pt, ga) ask
+# allowance() how many iterations they may run before the next check instead
+# of reading the clock on every iteration.
+#
+# The budget also makes every algorithm an anytime algorithm: improvements are
+# recorded in the History the budget hands out, which can pass each of them to
+# a callback as it happens instead of (or besides) keeping them in memory, and
+# a run stops at its next check once its stop token is set or an improvement
+# reaches target_obj (see solver.anytime for the iterator interface).
+
+# Iterations between budget checks for algorithms with cheap iterations
+CHECK_EVERY = 256
+
+
+class Budget:
+    """
+    Wall-clock, evaluation and iteration limits of one run.
+
+    Attributes:
+    - time_limit: seconds from start() (None = no wall-clock limit)
+    - max_evals: objective evaluations allowed (None = unlimited)
+    - max_iters: iterations allowed (None = unlimited)
+    - target_obj: stop as soon as the best objective is <= this (None = only at 0)
+    - stop_event: cancellation token, anything with is_set() (e.g. threading.Event),
+      shared by every run started from this budget; None gives each start()
+      a fresh threading.Event, so a stopped run does not stop the next one
+    - on_improvement: callback receiving every history entry as it is recorded
+    - keep_history: False keeps only the latest history entry in memory
+    """
+    def __init__(
+        self,
+        time_limit: Optional[float] = None,
+        max_evals: Optional[int] = None,
+        max_iters: Optional[int] = None,
+        target_obj: Optional[int] = None,
+        stop_event=None,
+        on_improvement: Optional[Callable[[tuple], None]] = None,
+        keep_history: bool = True
+    ):
+        self.time_limit = time_limit
+        self.max_evals = max_evals
+        self.max_iters = max_iters
+        self.target_obj = target_obj
+        self.stop_event = stop_event
+        self.on_improvement = on_improvement
+        self.keep_history = keep_history
+        self._start: Optional[float] = None
+        self._deadline: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return (f"Budget(time_limit={self.time_limit}, max_evals={self.max_evals}, "
+                f"max_iters={self.max_iters}, target_obj={self.target_obj})")
+
+    def start(self) -> 'Budget':
+        """Return a copy of this budget whose clock starts now (the original stays reusable)."""
+        started = copy.copy(self)
+        if self.stop_event is None:
+            started.stop_event = threading.Event()
+        started._start = time.perf_counter()
+        if self.time_limit is not None:
+            started._deadline = started._start + self.time_limit
+        return started
+
+    def elapsed(self) -> float:
+        """Seconds since start()."""
+        return time.perf_counter() - self._start
+
+    def remaining_time(self) -> Optional[float]:
+        """Seconds left until the deadline (None without a wall-clock limit)."""
+        if self._deadline is None:
+            return None
+        return self._deadline - time.perf_counter()
+
+    def exhausted(self, evaluations: int = 0, iterations: int = 0) -> bool:
+        """
+        True once any limit is reached.
+
+        Parameters:
+        - evaluations: objective evaluations done so far
+        - iterations: iterations done so far
+
+        Returns:
+        - whether the run must stop (the count limits are exact; the clock is read once per call)
+        """
+        if self.max_evals is not None and evaluations >= self.max_evals:
+            return True
+        if self.max_iters is not None and iterations >= self.max_iters:
+            return True
+        if self.stop_event is not None and self.stop_event.is_set():
+            return True
+        return self._deadline is not None and time.perf_counter() > self._deadline
+
+    def stop(self) -> None:
+        """
+        Ask the run to stop at its next check (safe to call from another thread).
+
+        Called on a budget that was not started, this only has an effect if it
+        was given a stop_event.
+        """
+        if self.stop_event is not None:
+            self.stop_event.set()
+
+    def history(self, *entries: tuple) -> 'History':
+        """A History reporting to this budget, starting with the given entries."""
+        history = History(self.on_improvement, self.keep_history, self.target_obj, self.stop_event)
+        for entry in entries:
+            history.append(entry)
+        return history
+
+    def progress(self, evaluations: int = 0, iterations: int = 0) -> Optional[float]:
+        """
+        Fraction of the budget used so far: the largest fraction over the set
+        limits, capped at 1 (None for an unlimited budget).
+        """
+        fractions = []
+        if self.time_limit is not None:
+            fractions.append(self.elapsed() / self.time_limit if self.time_limit > 0 else 1.0)
+        if self.max_evals is not None:
+            fractions.append(evaluations / self.max_evals if self.max_evals > 0 else 1.0)
+        if self.max_iters is not None:
+            fractions.append(iterations / self.max_iters if self.max_iters > 0 else 1.0)
+        return min(max(fractions), 1.0) if fractions else None
+
+    def allowance(self, evaluations: int = 0, iterations: int = 0, evals_per_iter: int = 1) -> int:
+        """
+        Iterations that may run before the next exhausted() check.
+
+        At most CHECK_EVERY (so the clock and the stop token are looked at
+        regularly), and never past the iteration or evaluation limit, so
+        count-limited runs stop exactly at the limit.
+
+        Parameters:
+        - evaluations, iterations: work done so far
+        - evals_per_iter: objective evaluations per iteration
+
+        Returns:
+        - number of iterations (at least 1)
+        """
+        steps = CHECK_EVERY
+        if self.max_iters is not None:
+            steps = min(steps, self.max_iters - iterations)
+        if self.max_evals is not None:
+            steps = min(steps, -(-(self.max_evals - evaluations) // evals_per_iter))
+        return max(steps, 1)
+
+
+class History(list):
+    """
+    Improvement log of one run: (elapsed, best_obj, *extra) entries.
+
+    Algorithms append to it like to the plain list it extends. Every entry is
+    also passed to on_improvement as it is recorded, an entry with
+    best_obj <= target_obj sets the stop token, and with keep=False only the
+    latest entry is kept, so runs that improve millions of times log in O(1)
+    memory.
+
+    Attributes:
+    - recorded: number of entries appended (kept or not)
+    - last: the latest entry (None before the first)
+    """
+    def __init__(
+        self,
+        on_improvement: Optional[Callable[[tuple], None]] = None,
+        keep: bool = True,
+        target_obj: Optional[int] = None,
+        stop_event=None
+    ):
+        super().__init__()
+        self.on_improvement = on_improvement
+        self.keep = keep
+        self.target_obj = target_obj
+        self.stop_event = stop_event
+        self.recorded = 0
+        self.last: Optional[tuple] = None
+
+    def append(self, entry: tuple) -> None:
+        self.recorded += 1
+        self.last = entry
+        if self.keep:
+            super().append(entry)
+        if self.on_improvement is not None:
+            self.on_improvement(entry)
+        if self.target_obj is not None and entry[1] <= self.target_obj and self.stop_event is not None:
+            self.stop_event.set()
+
+
+def start_budget(budget: Optional[Budget], time_limit: Optional[float] = None) -> Budget:
+    """
+    The started budget an algorithm runs under.
+
+    Parameters:
+    - budget: explicit Budget (takes precedence)
+    - time_limit: legacy time_limit argument, used when no budget is given
+
+    Returns:
+    - a started copy of budget, or a started wall-clock-only Budget(time_limit)
+    """
+    if budget is None:
+        budget = Budget(time_limit=time_limit)
+    return budget.start()
@@ -3,37 +3,77 @@ import sys
 import random
 import time
 import csv
+import json
 from pathlib import Path
 
+from solver import metrics
+from solver.budget import Budget, History
 from solver.problem import SubsetSum
-from solver.neighborhood import flip_neighbor, all_neighbors
+from solver.preprocess import preprocess
+from solver.neighborhood import flip_neighbor, all_neighbors, swap_neighbor, random_swap
 from solver.algorithms.full_search import full_search
 
 
-def parse_args():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description='Solver for Subset Sum using various metaheuristics.')
-    parser.add_argument('--input', '-i', required=True,
-                        help='Path to input file')
+    parser.add_argument('--input', '-i',
+                        help='Path to input file (required unless --batch is given)')
     parser.add_argument('--target', '-T', type=int,
                         help='Override target value from file')
-    parser.add_argument('--algorithm', '-a', required=True,
-                        choices=['full', 'hill', 'tabu', 'sa', 'ga'],
-                        help='Which algorithm to run')
+    parser.add_argument('--algorithm', '-a',
+                        choices=['full', 'dp', 'mitm', 'hill', 'tabu', 'sa', 'pt', 'ga', 'vga'],
+                        help='Which algorithm to run (required unless --batch is given)')
     parser.add_argument('--label', '-l',
                         help='Custom label for log filename (defaults to algorithm)')
-    parser.add_argument('--neighborhood', '-n', choices=['flip', 'all'], default='flip',
-                        help='Type of neighborhood to use')
+    parser.add_argument('--neighborhood', '-n', choices=['flip', 'all', 'swap'], default='flip',
+                        help='Type of neighborhood to use (swap: 1-in/1-out exchanges)')
     parser.add_argument('--time-limit', '-t', type=float,
                         help='Time limit in seconds (optional)')
+    parser.add_argument('--max-evals', type=int,
+                        help='Stop after this many objective evaluations (optional; with --seed the run '
+                             'is reproducible)')
+    parser.add_argument('--max-iters', type=int,
+                        help='Stop after this many iterations (optional)')
+    parser.add_argument('--stop-at', type=int,
+                        help='Stop as soon as |Sum - Target| <= this value (optional)')
     parser.add_argument('--seed', '-s', type=int,
                         help='Random seed (optional)')
+    parser.add_argument('--no-preprocess', dest='preprocess', action='store_false',
+                        help='Solve the instance as loaded, without the reduction pass')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Write the work counters of the run as JSON next to the history CSV')
+    parser.add_argument('--profile', action='store_true',
+                        help='Run under cProfile and tracemalloc and write a pstats file next to the history CSV')
+    parser.add_argument('--init', choices=['random', 'greedy', 'kk', 'rgreedy'], default='random',
+                        help='Starting solution construction (heuristic algorithms; exact ones ignore it)')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Number of worker processes for parallel modes (with --batch: jobs run at once)')
+    parser.add_argument('--chains', type=int, default=1,
+                        help='Independent multi-start chains for hill, tabu and sa')
+    # Parameter for exact dynamic programming
+    parser.add_argument('--max-memory', type=float, default=1024,
+                        help='Memory limit in MB for the dp and mitm algorithms')
+    parser.add_argument('--targets',
+                        help='File with many targets (whitespace-separated); dp builds one sum index '
+                             'and answers every target from it')
+    parser.add_argument('--batch',
+                        help='JSONL manifest of jobs given as CLI flags, run in this process '
+                             '(or on --workers processes) with every instance parsed once')
+    parser.add_argument('--batch-output',
+                        help='JSONL file the batch results stream to as jobs finish '
+                             '(default: experiments/logs/{manifest}_results.jsonl; - for stdout)')
+    # Parameter for meet-in-the-middle
+    parser.add_argument('--variant', choices=['hs', 'ss'], default='hs',
+                        help='Meet-in-the-middle variant: Horowitz-Sahni or Schroeppel-Shamir')
     # Parameters for hill climbing
     parser.add_argument('--random-choice', action='store_true',
                         help='Random choice among improving neighbors in hill climbing')
+    parser.add_argument('--engine', choices=['scan', 'index'], default='scan',
+                        help='Move selection engine for hill climbing and tabu search')
     # Parameter for tabu search
     parser.add_argument('--tabu-size', type=int, default=50,
-                        help='Tabu list size for tabu search')
+                        help='Tabu tenure (iterations a flipped bit stays tabu)')
     # Parameters for simulated annealing
     parser.add_argument('--initial-temp', type=float, default=100.0,
                         help='Initial temperature for SA')
@@ -41,99 +81,415 @@ def parse_args():
                         help='Cooling rate alpha for SA')
     parser.add_argument('--min-temp', type=float, default=1e-3,
                         help='Minimum temperature to stop SA')
-    parser.add_argument('--schedule', choices=['exponential', 'linear'], default='exponential',
-                        help='Cooling schedule for SA')
-    # Parameters for GA
+    parser.add_argument('--schedule', choices=['exponential', 'linear', 'adaptive'],
+                        default='exponential',
+                        help='Cooling schedule for SA '
+                             '(adaptive requires a budget (--time-limit, --max-evals or --max-iters))')
+    # Parameters for parallel tempering
+    parser.add_argument('--replicas', type=int, default=16,
+                        help='Number of replicas (temperatures) for parallel tempering')
+    parser.add_argument('--t-min', type=float, default=1.0,
+                        help='Lowest temperature of the parallel tempering ladder')
+    parser.add_argument('--t-max', type=float, default=1000.0,
+                        help='Highest temperature of the parallel tempering ladder')
+    parser.add_argument('--swap-interval', type=int, default=50,
+                        help='Steps between replica exchange attempts in parallel tempering')
+    # Parameters for GA (ga and vga)
     parser.add_argument('--pop-size', type=int, default=100,
                         help='Population size for GA')
     parser.add_argument('--crossover', choices=['one_point', 'uniform'], default='one_point',
                         help='Crossover type for GA')
     parser.add_argument('--mutation', choices=['flip', 'swap'], default='flip',
                         help='Mutation type for GA')
-    return parser.parse_args()
+    parser.add_argument('--cache-size', type=int, default=10000,
+                        help='Size of the LRU objective cache for GA')
+    return parser
 
 
-def main():
-    args = parse_args()
+def parse_args(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # A batch manifest names the instance and algorithm of every job itself
+    if args.batch is None:
+        missing = [flag for flag, value in (('--input', args.input), ('--algorithm', args.algorithm))
+                   if value is None]
+        if missing:
+            parser.error(f"the following arguments are required: {', '.join(missing)}")
+    return args
+
+
+def solve(args, problem, log=print, on_improvement=None, stop_event=None, keep_history=True):
+    """
+    Run the algorithm configured by parsed CLI args on a loaded instance.
+
+    Seeds the RNG, applies the target override and the reduction pass, and maps
+    the result back to the original indices. Progress notes go through `log`.
+    The instance itself is not modified, so one loaded instance can serve many runs.
+    The algorithms' work counters are collected into a fresh metrics.Metrics.
 
+    Every history entry (over the original instance) is passed to
+    on_improvement as soon as the algorithm records it; keep_history=False
+    keeps only the latest entry in memory. Setting stop_event (e.g. a
+    threading.Event) stops the run at the algorithm's next budget check, and
+    args.stop_at stops it once |Sum - Target| <= args.stop_at.
+
+    Returns:
+    - (best_solution, best_obj, history, elapsed, run_metrics) over the original instance
+
+    Raises:
+    - ValueError: when the algorithm rejects the instance or the parameters
+    """
     # Set random seed if provided
     if args.seed is not None:
         random.seed(args.seed)
 
-    # Load problem instance
-    problem = SubsetSum.from_file(args.input)
+    with metrics.collect() as run_metrics:
+        best_sol, best_obj, history, elapsed = _solve(
+            args, problem, log, History(on_improvement, keep_history), stop_event)
+    return best_sol, best_obj, history, elapsed, run_metrics
+
+
+def _solve(args, problem, log, history, stop_event):
     if args.target is not None:
-        problem.target = args.target
+        problem = SubsetSum(problem.values, args.target)
 
-    # Determine label for log file naming
-    label = args.label if args.label else args.algorithm
+    # Reduce the instance; algorithms see the reduced one, results are mapped back
+    reduction = None
+    if args.preprocess:
+        with metrics.phase('preprocess'):
+            reduction = preprocess(problem)
+        note = f', values divided by {reduction.scale}' if reduction.scale > 1 else ''
+        log(f'Preprocessing: n = {problem.n} -> {reduction.problem.n}{note}')
+        problem = reduction.problem
+
+    # Algorithms stream their improvements into history. The reduction divides the
+    # values and the target by the same scale, so scale * obj is exactly the gap
+    # |Sum - Target| of the restored solution, and --stop-at converts exactly
+    scale = reduction.scale if reduction is not None else 1
+
+    def record(entry):
+        t, obj, *extra = entry
+        history.append((t, obj * scale, *extra))
+
+    budget = Budget(
+        args.time_limit, args.max_evals, args.max_iters,
+        target_obj=args.stop_at // scale if args.stop_at is not None else None,
+        stop_event=stop_event,
+        on_improvement=record,
+        keep_history=False
+    )
+
+    def run_trajectory(algorithm, **params):
+        # With --chains K > 1 the algorithm runs as K independent seeded chains
+        if args.chains > 1:
+            from solver.algorithms.multistart import multi_start
+            return multi_start(
+                problem,
+                algorithm,
+                chains=args.chains,
+                workers=args.workers,
+                seed=args.seed,
+                budget=budget,
+                **params
+            )
+        return algorithm(problem, budget=budget, **params)
 
     # Dispatch to the selected algorithm
     start_time = time.time()
-    if args.algorithm == 'full':
-        best_sol, best_obj, history = full_search(problem, time_limit=args.time_limit)
+    if reduction is not None and reduction.trivial:
+        # Preprocessing already decided the optimum
+        best_sol, best_obj = problem.solution([]), 0
+    elif args.algorithm == 'full':
+        best_sol, best_obj, _ = full_search(
+            problem,
+            budget=budget,
+            workers=args.workers
+        )
+    elif args.algorithm == 'dp':
+        from solver.algorithms.dp import dp_search, dp_memory_estimate
+        log(f'Estimated DP memory: {dp_memory_estimate(problem) / 2 ** 20:.1f} MB')
+        best_sol, best_obj, _ = dp_search(
+            problem,
+            budget=budget,
+            max_memory_mb=args.max_memory
+        )
+    elif args.algorithm == 'mitm':
+        from solver.algorithms.mitm import meet_in_the_middle
+        best_sol, best_obj, _ = meet_in_the_middle(
+            problem,
+            budget=budget,
+            variant=args.variant,
+            max_memory_mb=args.max_memory
+        )
     elif args.algorithm == 'hill':
         from solver.algorithms.hill_climb import hill_climb
-        neigh = flip_neighbor if args.neighborhood == 'flip' else all_neighbors
-        best_sol, best_obj, history = hill_climb(
-            problem,
+        neigh = {'flip': flip_neighbor, 'all': all_neighbors, 'swap': swap_neighbor}[args.neighborhood]
+        best_sol, best_obj, _ = run_trajectory(
+            hill_climb,
             neighborhood=neigh,
-            time_limit=args.time_limit,
-            random_choice=args.random_choice
+            random_choice=args.random_choice,
+            engine=args.engine,
+            init=args.init
         )
     elif args.algorithm == 'tabu':
         from solver.algorithms.tabu import tabu_search
-        neigh = all_neighbors if args.neighborhood == 'all' else flip_neighbor
-        best_sol, best_obj, history = tabu_search(
-            problem,
+        neigh = {'flip': flip_neighbor, 'all': all_neighbors, 'swap': swap_neighbor}[args.neighborhood]
+        best_sol, best_obj, _ = run_trajectory(
+            tabu_search,
             neighborhood=neigh,
             tabu_size=args.tabu_size,
-            time_limit=args.time_limit
+            engine=args.engine,
+            init=args.init
         )
     elif args.algorithm == 'sa':
         from solver.algorithms.sa import simulated_annealing
-        best_sol, best_obj, history = simulated_annealing(
-            problem,
-            neighborhood=flip_neighbor,
+        best_sol, best_obj, _ = run_trajectory(
+            simulated_annealing,
+            neighborhood=random_swap if args.neighborhood == 'swap' else flip_neighbor,
             schedule=args.schedule,
             initial_temp=args.initial_temp,
             alpha=args.alpha,
             min_temp=args.min_temp,
-            time_limit=args.time_limit
+            init=args.init
+        )
+    elif args.algorithm == 'pt':
+        from solver.algorithms.pt import parallel_tempering
+        best_sol, best_obj, _ = parallel_tempering(
+            problem,
+            replicas=args.replicas,
+            t_min=args.t_min,
+            t_max=args.t_max,
+            swap_interval=args.swap_interval,
+            budget=budget,
+            init=args.init
         )
     elif args.algorithm == 'ga':
         from solver.algorithms.ga import genetic_algorithm
-        best_sol, best_obj, history = genetic_algorithm(
+        best_sol, best_obj, _ = genetic_algorithm(
+            problem,
+            pop_size=args.pop_size,
+            crossover=args.crossover,
+            mutation=args.mutation,
+            budget=budget,
+            cache_size=args.cache_size,
+            init=args.init
+        )
+    elif args.algorithm == 'vga':
+        from solver.algorithms.ga_vectorized import vectorized_genetic_algorithm
+        best_sol, best_obj, _ = vectorized_genetic_algorithm(
             problem,
             pop_size=args.pop_size,
             crossover=args.crossover,
             mutation=args.mutation,
-            time_limit=args.time_limit
+            budget=budget,
+            init=args.init
         )
     else:
-        print(f"Unknown algorithm: {args.algorithm}")
-        sys.exit(1)
+        raise ValueError(f"Unknown algorithm: {args.algorithm}")
 
     elapsed = time.time() - start_time
+    metrics.current().add_phase('search', elapsed)
 
-    # Display results
-    total = sum(val for val, bit in zip(problem.values, best_sol) if bit)
-    print('Best solution:', best_sol)
-    print('Sum:', total)
-    print('|Sum - Target|:', best_obj)
-    print(f'Elapsed time: {elapsed:.2f}s')
+    if reduction is not None:
+        # Report over the original indices
+        best_sol = reduction.restore(best_sol)
+        best_obj = best_sol.objective
+        if reduction.trivial:
+            history.append((0.0, best_obj))
+
+    return best_sol, best_obj, history, elapsed
+
+
+def main():
+    args = parse_args()
+
+    if args.batch is not None:
+        run_batch(args)
+        return
+
+    # Load problem instance
+    problem = SubsetSum.from_file(args.input)
+
+    # Multi-target mode: one index over the achievable sums answers every target
+    if args.targets is not None:
+        if args.algorithm != 'dp':
+            print('--targets is only supported by the dp algorithm')
+            sys.exit(1)
+        answer_targets(args, problem)
+        return
 
-    # Save history to CSV
+    # Determine label for log file naming
+    label = args.label if args.label else args.algorithm
     logs_dir = Path('experiments') / 'logs'
     logs_dir.mkdir(parents=True, exist_ok=True)
     instance_name = Path(args.input).stem
     log_file = logs_dir / f"{instance_name}_{label}.csv"
+
+    # The history is written while the run goes, not kept in memory
+    try:
+        with open(log_file, 'w', newline='') as f:
+            history_csv = HistoryCsv(f)
+            if args.profile:
+                result = run_profiled(args, problem, log_file.with_suffix('.pstats'),
+                                      on_improvement=history_csv, keep_history=False)
+            else:
+                result = solve(args, problem, on_improvement=history_csv, keep_history=False)
+            history_csv.finish()
+    except ValueError as e:
+        log_file.unlink(missing_ok=True)
+        print(e)
+        sys.exit(1)
+    best_sol, best_obj, history, elapsed, run_metrics = result
+
+    # Display results
+    print('Best solution:', best_sol.tolist())
+    print('Sum:', best_sol.total)
+    print('|Sum - Target|:', best_obj)
+    print(f'Elapsed time: {elapsed:.2f}s')
+    report = run_metrics.as_dict()
+    # --stop-at ended the run only if it was reached above 0 (0 ends every run)
+    # and before any limit of the budget ran out
+    budget_spent = (
+        (args.time_limit is not None and elapsed >= args.time_limit)
+        or (args.max_evals is not None and report['evaluations'] >= args.max_evals)
+        or (args.max_iters is not None and report['iterations'] >= args.max_iters)
+    )
+    if args.stop_at is not None and 0 < best_obj <= args.stop_at and not budget_spent:
+        print(f'Stopped early: |Sum - Target| <= {args.stop_at}')
+    print(f"Evaluations: {report['evaluations']} ({report['evaluations_per_sec']:.0f}/s), "
+          f"iterations: {report['iterations']}, "
+          f"moves accepted: {report['moves_accepted']}/{report['moves_proposed']}")
+
+    if args.metrics:
+        metrics_file = log_file.with_name(f"{log_file.stem}_metrics.json")
+        with open(metrics_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Metrics saved to {metrics_file}")
+
+    print(f"History saved to {log_file}")
+
+
+class HistoryCsv:
+    """
+    on_improvement callback writing history entries to a CSV file as they are
+    recorded, so long runs log in constant memory and an interrupted run
+    still leaves its log behind.
+    """
+    def __init__(self, f):
+        self.writer = csv.writer(f)
+        self.rows = 0
+
+    def __call__(self, entry):
+        t, obj, *extra = entry
+        if not self.rows:
+            # full search also logs its enumeration rate
+            self.writer.writerow(['time', 'best_obj'] + (['subsets_per_sec'] if extra else []))
+        self.rows += 1
+        self.writer.writerow([f"{t:.4f}", obj] + [f"{x:.1f}" for x in extra])
+
+    def finish(self):
+        """Write the header of an empty log."""
+        if not self.rows:
+            self.writer.writerow(['time', 'best_obj'])
+
+
+def run_profiled(args, problem, stats_file, **options):
+    # Solve under cProfile and tracemalloc (both slow the run down noticeably),
+    # save the pstats file and print the hottest functions and the traced peak
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        result = solve(args, problem, **options)
+    finally:
+        profiler.disable()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    profiler.dump_stats(stats_file)
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+    print(f'Peak traced memory: {traced_peak / 2 ** 20:.1f} MB')
+    print(f'Profile saved to {stats_file}')
+    return result
+
+
+def run_batch(args):
+    # Run every job of the manifest and stream one JSON record per finished job
+    from solver.jobs import read_manifest, run_jobs
+    try:
+        jobs = read_manifest(args.batch)
+    except OSError as e:
+        print(e)
+        sys.exit(1)
+
+    to_stdout = args.batch_output == '-'
+    if to_stdout:
+        out = sys.stdout
+    else:
+        if args.batch_output is None:
+            logs_dir = Path('experiments') / 'logs'
+            logs_dir.mkdir(parents=True, exist_ok=True)
+            output = logs_dir / f"{Path(args.batch).stem}_results.jsonl"
+        else:
+            output = Path(args.batch_output)
+        out = open(output, 'w')
+
+    start_time = time.time()
+    failed = 0
+    try:
+        for done, record in enumerate(run_jobs(jobs, workers=args.workers), 1):
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+            failed += 'error' in record
+            if not to_stdout:
+                status = record.get('error', f"|Sum - Target| = {record.get('best_obj')}")
+                print(f"[{done}/{len(jobs)}] job {record['id']}: {status}")
+    finally:
+        if not to_stdout:
+            out.close()
+    if not to_stdout:
+        print(f"{len(jobs)} jobs ({failed} failed) in {time.time() - start_time:.2f}s")
+        print(f"Results saved to {output}")
+
+
+def answer_targets(args, problem):
+    # The index is target-independent, so the target-specific reduction pass is skipped
+    targets = [int(t) for t in Path(args.targets).read_text().split()]
+    start_time = time.time()
+    try:
+        index = problem.sum_index(max_memory_mb=args.max_memory)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    print(f'Index built in {time.time() - start_time:.2f}s')
+
+    rows = []
+    query_start = time.time()
+    for target in targets:
+        t = time.time()
+        sol, obj = index.query(target)
+        elapsed = time.time() - t
+        rows.append((target, sol.total, obj, elapsed, [i for i, b in enumerate(sol.bits) if b]))
+        print(f'Target {target}: sum {sol.total}, |Sum - Target| {obj}')
+    if targets:
+        mean_ms = (time.time() - query_start) / len(targets) * 1e3
+        print(f'{len(targets)} targets, {mean_ms:.3f} ms per query')
+
+    # Kept apart from the convergence logs, which plot_convergence.py reads as time series
+    results_dir = Path('experiments') / 'targets'
+    results_dir.mkdir(parents=True, exist_ok=True)
+    label = args.label if args.label else f'{args.algorithm}_targets'
+    log_file = results_dir / f"{Path(args.input).stem}_{label}.csv"
     with open(log_file, 'w', newline='') as f:
         writer = csv.writer(f)
-        writer.writerow(['time', 'best_obj'])
-        for t, obj in history:
-            writer.writerow([f"{t:.4f}", obj])
-    print(f"History saved to {log_file}")
+        writer.writerow(['target', 'sum', 'best_obj', 'query_ms', 'selected'])
+        for target, total, obj, elapsed, selected in rows:
+            writer.writerow([target, total, obj, f"{elapsed * 1e3:.3f}", ' '.join(map(str, selected))])
+    print(f"Results saved to {log_file}")
 
 
 if __name__ == '__main__':
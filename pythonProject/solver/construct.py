@@ -0,0 +1,172 @@
+import heapq
+import random
+from collections import deque
+from typing import List
+
+import numpy as np
+
+from solver.problem import SubsetSum, Solution
+
+
+# Module providing constructive starting solutions for the Subset Sum problem.
+#
+# All constructions run in O(n log n) and land close to the target, so local
+# search starts in the right region instead of about n*mean/2 away from it.
+# Algorithms select one by name through their `init` parameter (--init).
+
+
+def greedy(problem: SubsetSum) -> Solution:
+    """
+    Greedy largest-first fill: take values in descending order and keep each
+    one that still fits under the target; finally add the smallest value that
+    overshoots the target if that ends closer to it.
+
+    Parameters:
+    - problem: SubsetSum instance
+
+    Returns:
+    - Solution built from the greedy selection
+    """
+    values = np.asarray(problem.values, dtype=np.int64)
+    order = np.argsort(-values, kind='stable')
+    return problem.solution(_fill(values, problem.target, order))
+
+
+def randomized_greedy(problem: SubsetSum, noise: float = 0.5) -> Solution:
+    """
+    Randomized greedy fill: like greedy, but values are ordered by
+    value * uniform(1 - noise, 1 + noise), so repeated calls give different,
+    still near-target solutions (used to seed diverse populations).
+
+    Parameters:
+    - problem: SubsetSum instance
+    - noise: relative perturbation of the sort keys (0 = plain greedy)
+
+    Returns:
+    - Solution built from the randomized greedy selection
+    """
+    rng = np.random.default_rng(random.getrandbits(64))
+    values = np.asarray(problem.values, dtype=np.int64)
+    keys = values * rng.uniform(1 - noise, 1 + noise, size=problem.n)
+    order = np.argsort(-keys, kind='stable')
+    return problem.solution(_fill(values, problem.target, order))
+
+
+def karmarkar_karp(problem: SubsetSum) -> Solution:
+    """
+    Karmarkar–Karp differencing adapted to an arbitrary target.
+
+    A dummy element d = |sum(values) - 2*target| is added, so that a perfect
+    two-way partition of the values plus d splits off a subset summing to
+    exactly the target: the dummy's side if sum(values) >= 2*target, the
+    other side otherwise. The largest differencing heuristic repeatedly
+    replaces the two largest numbers by their difference (placing them on
+    opposite sides); the sides are recovered by 2-coloring the tree of
+    differencing steps.
+
+    Parameters:
+    - problem: SubsetSum instance
+
+    Returns:
+    - Solution selecting the values on the target side of the partition
+    """
+    n = problem.n
+    values = [int(v) for v in problem.values]
+    total = sum(values)
+    dummy = n
+    weights = values + [abs(total - 2 * problem.target)]
+
+    # Max-heap of (-weight, node); node a keeps standing for the difference a - b
+    heap = [(-w, i) for i, w in enumerate(weights)]
+    heapq.heapify(heap)
+    adjacent: List[List[int]] = [[] for _ in weights]
+    while len(heap) > 1:
+        a_weight, a = heapq.heappop(heap)
+        b_weight, b = heapq.heappop(heap)
+        adjacent[a].append(b)
+        adjacent[b].append(a)
+        heapq.heappush(heap, (a_weight - b_weight, a))
+
+    # Every differencing edge joins opposite sides: 2-color the tree from the dummy
+    side = [0] * len(weights)
+    seen = [False] * len(weights)
+    seen[dummy] = True
+    queue = deque([dummy])
+    while queue:
+        node = queue.popleft()
+        for other in adjacent[node]:
+            if not seen[other]:
+                seen[other] = True
+                side[other] = side[node] ^ 1
+                queue.append(other)
+
+    wanted = 0 if total >= 2 * problem.target else 1
+    return problem.solution(side[i] == wanted for i in range(n))
+
+
+def initial_solution(problem: SubsetSum, init: str = 'random') -> Solution:
+    """
+    Build one starting solution with the named construction.
+
+    Parameters:
+    - problem: SubsetSum instance
+    - init: 'random', 'greedy', 'kk' (Karmarkar–Karp) or 'rgreedy' (randomized greedy)
+
+    Returns:
+    - the starting Solution
+    """
+    if init == 'random':
+        return problem.random_solution()
+    elif init == 'greedy':
+        return greedy(problem)
+    elif init == 'kk':
+        return karmarkar_karp(problem)
+    elif init == 'rgreedy':
+        return randomized_greedy(problem)
+    raise ValueError(f"Unknown initialization: {init}")
+
+
+def initial_population(problem: SubsetSum, size: int, init: str = 'random') -> List[Solution]:
+    """
+    Build a starting population with the named construction.
+
+    'random' and 'rgreedy' draw every individual independently. The
+    deterministic constructions ('greedy', 'kk') give one individual; the
+    rest of the population is filled by randomized greedy to keep it diverse.
+
+    Parameters:
+    - problem: SubsetSum instance
+    - size: number of individuals
+    - init: name of the construction (see initial_solution)
+
+    Returns:
+    - list of `size` Solutions
+    """
+    if init in ('random', 'rgreedy'):
+        return [initial_solution(problem, init) for _ in range(size)]
+    seeded = [initial_solution(problem, init)]
+    return seeded + [randomized_greedy(problem) for _ in range(size - 1)]
+
+
+def _fill(values: np.ndarray, target: int, order: np.ndarray) -> bytearray:
+    # Visit the values in the given order and keep each one that still fits under the target
+    bits = bytearray(len(values))
+    gap = target
+    smallest = int(values.min()) if len(values) else 0
+    as_list = values.tolist()
+    for i in order.tolist():
+        v = as_list[i]
+        if v <= gap:
+            bits[i] = 1
+            gap -= v
+            # Nothing else can fit once the gap is below the smallest value
+            if gap == 0 or gap < smallest:
+                break
+
+    # One overshooting value may end closer to the target than the remaining gap
+    over = np.flatnonzero((np.frombuffer(bits, dtype=np.uint8) == 0) & (values > gap))
+    if gap > 0 and over.size:
+        k = over[np.argmin(values[over])]
+        if values[k] - gap < gap:
+            bits[k] = 1
+    return bits
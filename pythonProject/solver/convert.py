@@ -0,0 +1,29 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from solver.formats import BINARY_SUFFIX, convert_text_to_binary, convert_binary_to_text
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convert Subset Sum instances between the text and binary (.ssb) formats.')
+    parser.add_argument('source', help='Input instance (.ssb or text)')
+    parser.add_argument('destination', help='Output path; the format is the opposite of the input')
+    args = parser.parse_args()
+
+    start_time = time.time()
+    try:
+        if Path(args.source).suffix == BINARY_SUFFIX:
+            n = convert_binary_to_text(args.source, args.destination)
+        else:
+            n = convert_text_to_binary(args.source, args.destination)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    print(f"Converted {n} values to {args.destination} in {time.time() - start_time:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Tuple
+
+import numpy as np
+
+
+# Module providing the on-disk instance formats.
+#
+# Text format (.txt and anything else):
+#     n target
+#     a1 a2 ... an            (values may span any number of lines)
+#
+# Binary format (.ssb): a 24-byte header followed by the values as a
+# little-endian int64 array, so the values can be memory-mapped with no
+# parsing and no copy:
+#     magic b'SSB1' | n: uint64 LE | target: int64 LE | n x int64 LE
+
+MAGIC = b'SSB1'
+HEADER = struct.Struct('<4sQq')
+BINARY_SUFFIX = '.ssb'
+# Bytes of text parsed per step by the streaming parser
+CHUNK_SIZE = 1 << 20
+
+
+def read_binary(path: str) -> Tuple[np.ndarray, int]:
+    """
+    Memory-map the values of a .ssb file.
+
+    Returns:
+    - values: read-only int64 np.memmap (an empty array for n = 0)
+    - target: the target sum
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise ValueError(f"Truncated header in {path}")
+    magic, n, target = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"Not a Subset Sum binary instance: {path}")
+    expected = HEADER.size + 8 * n
+    if Path(path).stat().st_size != expected:
+        raise ValueError(f"Expected {n} values in {path}, file size does not match")
+    if n == 0:
+        return np.empty(0, dtype=np.int64), target
+    return np.memmap(path, dtype='<i8', mode='r', offset=HEADER.size, shape=(n,)), target
+
+
+def write_binary(path: str, n: int, target: int, chunks: Iterable[np.ndarray]) -> None:
+    """Write a .ssb file from the header fields and the values given in chunks."""
+    written = 0
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, n, target))
+        for chunk in chunks:
+            f.write(np.asarray(chunk, dtype='<i8').tobytes())
+            written += len(chunk)
+    if written != n:
+        raise ValueError(f"Expected {n} values, but got {written}")
+
+
+def read_text(path: str) -> Tuple[np.ndarray, int]:
+    """
+    Parse a text instance into an int64 array with the streaming parser.
+
+    Returns:
+    - values: int64 array of length n
+    - target: the target sum
+    """
+    with open(path, 'rb') as f:
+        n, target = _text_header(f)
+        values = np.empty(n, dtype=np.int64)
+        filled = 0
+        for chunk in _text_chunks(f):
+            if filled + len(chunk) > n:
+                raise ValueError(f"Expected {n} values, but got more")
+            values[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+    if filled != n:
+        raise ValueError(f"Expected {n} values, but got {filled}")
+    return values, target
+
+
+def convert_text_to_binary(src: str, dst: str) -> int:
+    """Stream a text instance into a .ssb file without holding all values in memory; returns n."""
+    with open(src, 'rb') as f:
+        n, target = _text_header(f)
+        write_binary(dst, n, target, _text_chunks(f))
+    return n
+
+
+def convert_binary_to_text(src: str, dst: str) -> int:
+    """Write a .ssb instance back in the text format (values on one line); returns n."""
+    values, target = read_binary(src)
+    with open(dst, 'w') as f:
+        f.write(f"{len(values)} {target}\n")
+        for start in range(0, len(values), CHUNK_SIZE):
+            if start:
+                f.write(' ')
+            f.write(' '.join(map(str, values[start:start + CHUNK_SIZE].tolist())))
+        f.write('\n')
+    return len(values)
+
+
+def _text_header(f: BinaryIO) -> Tuple[int, int]:
+    # Read and parse the first line (n and target)
+    first_line = f.readline().split()
+    if len(first_line) != 2:
+        raise ValueError(f"Invalid header line: {[t.decode() for t in first_line]}")
+    n, target = map(int, first_line)
+    return n, target
+
+
+def _text_chunks(f: BinaryIO) -> Iterator[np.ndarray]:
+    # Parse the values in blocks of CHUNK_SIZE bytes; a number cut by the block
+    # boundary is carried over and completed by the next block
+    carry = b''
+    while True:
+        block = f.read(CHUNK_SIZE)
+        text = carry + block
+        if block:
+            head = text.rstrip(b'+-0123456789')
+            carry = text[len(head):]
+        else:
+            head, carry = text, b''
+        # fromstring turns whitespace-only input into [0], so skip it explicitly
+        if head.strip():
+            try:
+                yield np.fromstring(head, dtype=np.int64, sep=' ')
+            except ValueError:
+                raise ValueError("Invalid token in the values section") from None
+        if not block:
+            return
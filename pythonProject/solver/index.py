@@ -0,0 +1,85 @@
+from typing import Callable, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from solver.problem import Solution
+
+
+class FlipIndex:
+    """
+    Sorted-value index answering "best single flip" queries by bisection.
+
+    With gap = T - s, adding an unselected value v gives |v - gap| and dropping
+    a selected value v gives |v - (-gap)|. The best flip is therefore the
+    unselected value closest to gap or the selected value closest to -gap,
+    both found by bisection in sorted containers of (value, index) pairs.
+    Moves must be applied through flip(), which updates the solution and moves
+    one entry between the containers in O(log n).
+
+    Attributes:
+    - solution: the Solution being indexed
+    - selected: SortedList of (value, index) for bits set to 1
+    - unselected: SortedList of (value, index) for bits set to 0
+    """
+    def __init__(self, solution: Solution):
+        self.solution = solution
+        values = solution.problem.values
+        self.selected = SortedList((values[i], i) for i, bit in enumerate(solution.bits) if bit)
+        self.unselected = SortedList((values[i], i) for i, bit in enumerate(solution.bits) if not bit)
+
+    def best_flip(
+        self,
+        allowed: Callable[[int, int], bool] = None
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Find the flip with the lowest resulting objective.
+
+        Parameters:
+        - allowed: optional predicate (index, objective) -> bool; candidates it
+          rejects (e.g. tabu moves without aspiration) are skipped
+
+        Returns:
+        - (index, objective) of the best allowed flip, or None if there is none
+        """
+        gap = self.solution.problem.target - self.solution.total
+        add = self._nearest(self.unselected, gap, allowed)
+        drop = self._nearest(self.selected, -gap, allowed)
+        if add is None:
+            return drop
+        if drop is None or add[1] <= drop[1]:
+            return add
+        return drop
+
+    def flip(self, idx: int) -> None:
+        """Apply the flip of bit idx to the solution and move it between containers."""
+        entry = (self.solution.problem.values[idx], idx)
+        if self.solution.bits[idx]:
+            self.selected.remove(entry)
+            self.unselected.add(entry)
+        else:
+            self.unselected.remove(entry)
+            self.selected.add(entry)
+        self.solution.flip(idx)
+
+    @staticmethod
+    def _nearest(
+        items: SortedList,
+        key: int,
+        allowed: Callable[[int, int], bool]
+    ) -> Optional[Tuple[int, int]]:
+        # Walk outwards from the bisection point in order of increasing |value - key|,
+        # so the first accepted entry is the best accepted one
+        hi = items.bisect_left((key, -1))
+        lo = hi - 1
+        size = len(items)
+        while lo >= 0 or hi < size:
+            if hi >= size or (lo >= 0 and key - items[lo][0] <= items[hi][0] - key):
+                value, idx = items[lo]
+                lo -= 1
+            else:
+                value, idx = items[hi]
+                hi += 1
+            obj = abs(value - key)
+            if allowed is None or allowed(idx, obj):
+                return idx, obj
+        return None
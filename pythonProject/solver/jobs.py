@@ -0,0 +1,256 @@
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import shlex
+from argparse import Namespace
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from solver.budget import History
+from solver.cli import parse_args, solve
+from solver.problem import SubsetSum
+
+
+# Module providing the pieces shared by runners that execute many jobs in one
+# long-lived process: job arguments given in the same terms as the CLI flags,
+# an LRU cache of parsed instances keyed by content hash, the JSON-ready
+# record of a finished run, and the batch runner behind `solver.cli --batch`.
+
+# Flags that only make sense for a single CLI invocation
+UNSUPPORTED_FLAGS = ('--targets', '--profile', '--batch', '--batch-output')
+
+
+class InstanceCache:
+    """
+    LRU cache of parsed instances.
+
+    Keys are content hashes (see file_key and values_key), so a file is parsed
+    again only after its content changes, and identical instances given under
+    different paths share one entry.
+
+    Attributes:
+    - capacity: maximum number of instances kept
+    - hits, misses: lookup statistics
+    """
+    def __init__(self, capacity: int = 16):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, SubsetSum]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, load: Callable[[], SubsetSum]) -> SubsetSum:
+        """
+        Return the instance cached under key, calling load() on a miss.
+
+        The least recently used instance is evicted once capacity is exceeded.
+        """
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        problem = load()
+        self._entries[key] = problem
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return problem
+
+
+def file_key(path: str) -> str:
+    """
+    Content hash of an instance file.
+
+    The hash is memoized per (path, modification time, size), so repeated
+    jobs on an unchanged file do not read it again.
+    """
+    stat = os.stat(path)
+    return _file_digest(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=1024)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def values_key(values: Sequence[int], target: int) -> str:
+    """Content hash of an instance given inline as values and target."""
+    digest = hashlib.sha256(np.asarray(values, dtype=np.int64).tobytes())
+    digest.update(str(target).encode())
+    return digest.hexdigest()
+
+
+def parse_job_args(argv: Union[str, Sequence[str]], input_path: Optional[str] = None) -> Namespace:
+    """
+    Parse the arguments of one job with the CLI parser.
+
+    Parameters:
+    - argv: CLI flags as a list or a single shell-style string,
+      e.g. '--algorithm tabu --tabu-size 30'
+    - input_path: instance path filled in as --input (None: argv gives --input itself)
+
+    Returns:
+    - the parsed argparse Namespace
+
+    Raises:
+    - ValueError with the parser's message for invalid or unsupported flags
+    """
+    if isinstance(argv, str):
+        argv = shlex.split(argv)
+    argv = list(argv)
+    for flag in UNSUPPORTED_FLAGS:
+        if flag in argv:
+            raise ValueError(f"{flag} is not supported for jobs")
+    # argparse reports errors by printing and exiting; turn that into a ValueError
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr):
+            return parse_args(argv + (['--input', input_path] if input_path is not None else []))
+    except SystemExit:
+        lines = stderr.getvalue().strip().splitlines()
+        message = lines[-1].partition('error: ')[2] if lines else ''
+        raise ValueError(message or 'invalid job arguments') from None
+
+
+def result_record(best_sol, best_obj: int, history: History, elapsed: float, run_metrics,
+                  with_history: bool = False) -> dict:
+    """
+    JSON-ready summary of a finished run (the values returned by solver.cli.solve).
+
+    The solution is given as the list of selected indices; the improvement
+    history is included only when with_history is set (the run must then
+    have kept it).
+    """
+    record = {
+        'sum': int(best_sol.total),
+        'best_obj': int(best_obj),
+        'elapsed': elapsed,
+        'selected': [i for i, bit in enumerate(best_sol.bits) if bit],
+        'improvements': history.recorded,
+        'metrics': run_metrics.as_dict(),
+    }
+    if with_history:
+        record['history'] = [[float(t), int(obj), *map(float, extra)] for t, obj, *extra in history]
+    return record
+
+
+def read_manifest(path: str) -> List[dict]:
+    """
+    Read a batch manifest: one JSON job per line (blank lines and lines
+    starting with # are skipped).
+
+    A job is either just its CLI flags, as a string or a list, e.g.
+        "--input data/large.txt --algorithm tabu --tabu-size 30 --seed 1"
+    or an object {"id": ..., "args": flags, "input": path, "history": bool}
+    where only "args" is required ("input" may also be given inside the
+    flags; "id" defaults to the line number).
+
+    Returns:
+    - list of job dicts with 'id' and either 'args' (parsed Namespace) and
+      'history', or 'error' for a line that could not be parsed
+    """
+    jobs = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            job = {'id': number}
+            try:
+                try:
+                    spec = json.loads(line)
+                except json.JSONDecodeError:
+                    raise ValueError(f"Line {number} is not valid JSON") from None
+                if not isinstance(spec, dict):
+                    spec = {'args': spec}
+                job['id'] = spec.get('id', number)
+                job['args'] = parse_job_args(spec.get('args', []), spec.get('input'))
+                job['history'] = bool(spec.get('history'))
+            except ValueError as e:
+                job['error'] = str(e)
+            jobs.append(job)
+    return jobs
+
+
+def run_jobs(jobs: List[dict], workers: int = 1) -> Iterator[dict]:
+    """
+    Run parsed jobs and yield one record per job as it finishes.
+
+    Every distinct instance (by content hash) is loaded once, before any job
+    runs, and shared by all jobs on it: worker processes inherit the parsed
+    instances instead of parsing them again.
+
+    Parameters:
+    - jobs: job dicts as returned by read_manifest
+    - workers: processes running jobs at once (1 = run them in this process);
+      with several, every job runs with --workers 1 (pool workers cannot
+      start processes of their own)
+
+    Yields:
+    - {'id', 'input', 'algorithm', 'seed', **result_record(...)} for a
+      finished job, or {'id', 'error'} for a job that failed
+    """
+    instances: Dict[str, SubsetSum] = {}
+    tasks = []
+    for job in jobs:
+        if 'error' in job:
+            yield {'id': job['id'], 'error': job['error']}
+            continue
+        path = job['args'].input
+        try:
+            key = file_key(path)
+            if key not in instances:
+                instances[key] = SubsetSum.from_file(path)
+        except (OSError, ValueError) as e:
+            yield {'id': job['id'], 'error': str(e)}
+            continue
+        tasks.append((job, key))
+
+    if workers <= 1 or len(tasks) <= 1:
+        _init_batch_worker(instances)
+        yield from map(_run_batch_job, tasks)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_batch_worker, initargs=(instances,)) as pool:
+        yield from pool.imap_unordered(_run_batch_job, tasks)
+
+
+# Instances shared by the jobs of a batch, by content hash (set in every worker)
+_batch_instances: Dict[str, SubsetSum] = {}
+
+
+def _init_batch_worker(instances: Dict[str, SubsetSum]) -> None:
+    global _batch_instances
+    _batch_instances = instances
+
+
+def _run_batch_job(task) -> dict:
+    job, key = task
+    args = job['args']
+    record = {'id': job['id'], 'input': args.input, 'algorithm': args.algorithm, 'seed': args.seed}
+    if args.workers > 1 and multiprocessing.current_process().daemon:
+        # Pool workers cannot start processes of their own: run the job's
+        # parallel parts (full search ranges, multi-start chains) in this worker
+        args = Namespace(**vars(args))
+        args.workers = 1
+    try:
+        result = solve(args, _batch_instances[key], log=lambda msg: None, keep_history=job['history'])
+    except ValueError as e:
+        record['error'] = str(e)
+        return record
+    except Exception as e:
+        # An algorithm failure ends only this job, not the batch
+        record['error'] = f"{type(e).__name__}: {e}"
+        return record
+    record.update(result_record(*result, with_history=job['history']))
+    return record
@@ -0,0 +1,130 @@
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+# Module providing the shared instrumentation layer.
+#
+# Algorithms keep their work counts in local variables inside the hot loops and
+# report the totals once per run (or once per block of work) with count(), so
+# the instrumentation adds nothing per evaluation. Counts go to the active
+# collector: the CLI installs a fresh one per run with collect(); outside of it
+# they land in a default collector that nobody reads.
+
+COUNTERS = ('evaluations', 'moves_proposed', 'moves_accepted', 'iterations', 'restarts')
+
+
+class Metrics:
+    """
+    Work counters and phase timings of one run.
+
+    Attributes:
+    - counters: totals of the names in COUNTERS (objective evaluations, moves
+      proposed and accepted, iterations, restarts)
+    - phases: seconds spent in each named phase
+    - elapsed: wall-clock seconds from creation to stop() (None while running)
+    - peak_memory_mb: peak resident memory of the process at stop(), if known
+    """
+    def __init__(self):
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self.phases: Dict[str, float] = {}
+        self.elapsed: Optional[float] = None
+        self.peak_memory_mb: Optional[float] = None
+        self._start = time.perf_counter()
+
+    def count(self, **amounts: int) -> None:
+        """Add to the named counters, e.g. count(evaluations=n, iterations=1)."""
+        for name, amount in amounts.items():
+            self.counters[name] += int(amount)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and add it to phases[name]."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        """Add an externally measured duration to phases[name]."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def merge(self, counters: Dict[str, int], phases: Optional[Dict[str, float]] = None) -> None:
+        """Add counters and phase times reported by another collector (e.g. a worker process)."""
+        self.count(**counters)
+        for name, seconds in (phases or {}).items():
+            self.add_phase(name, seconds)
+
+    def stop(self) -> None:
+        """Freeze the elapsed time and sample the peak memory."""
+        self.elapsed = time.perf_counter() - self._start
+        self.peak_memory_mb = peak_memory_mb()
+
+    def as_dict(self) -> dict:
+        """
+        Counters, evaluations per second, phase times and peak memory as a plain dict.
+
+        The rate is taken over the 'search' phase when one was recorded (so
+        loading and preprocessing do not dilute it), else over the whole run.
+        """
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self._start
+        search = self.phases.get('search', elapsed)
+        rate = self.counters['evaluations'] / search if search > 0 else 0.0
+        return {
+            **self.counters,
+            'elapsed': elapsed,
+            'evaluations_per_sec': rate,
+            'phases': dict(self.phases),
+            'peak_memory_mb': self.peak_memory_mb,
+        }
+
+
+_current = Metrics()
+
+
+def current() -> Metrics:
+    """The active collector."""
+    return _current
+
+
+def count(**amounts: int) -> None:
+    """Add to the counters of the active collector."""
+    _current.count(**amounts)
+
+
+def phase(name: str):
+    """Time a block into the active collector: with metrics.phase('build'): ..."""
+    return _current.phase(name)
+
+
+@contextmanager
+def collect() -> Iterator[Metrics]:
+    """
+    Install a fresh collector for the enclosed block and yield it.
+
+    The previous collector is restored afterwards, so runs can be nested
+    (e.g. multi-start chains inside a CLI run) and merged explicitly.
+    """
+    global _current
+    previous, _current = _current, Metrics()
+    try:
+        yield _current
+    finally:
+        _current.stop()
+        _current = previous
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where the platform does not report it)."""
+    if resource is None:
+        return None
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
@@ -1,39 +1,183 @@
 import random
-from typing import List
+import weakref
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+from solver.problem import Solution
 
 
 # Module providing neighborhood generation functions for the Subset Sum problem.
+#
+# A neighbor is described by the index of the bit to flip rather than by a copy
+# of the whole bit-vector; algorithms evaluate a move with
+# Solution.flip_objective and apply it with Solution.flip, both O(1).
+# Swap neighborhoods describe a move as a pair (i, j) of bits flipped together
+# (one selected element out, one unselected element in); move_objective and
+# apply_move handle both kinds of moves.
+# FlipEvaluator scores a whole set of moves in one NumPy operation.
+
+Move = Union[int, Sequence[int]]
+
+# Per-problem cache of the value order used by swap_neighbor
+_sorted_cache = weakref.WeakKeyDictionary()
+
 
-def flip_neighbor(solution: List[int]) -> List[int]:
+def flip_neighbor(solution: Solution) -> Sequence[int]:
     """
     Generate a single neighbor by flipping one randomly chosen bit in the solution.
 
     Parameters:
-    - solution: current bit-vector solution
+    - solution: current solution
 
     Returns:
-    - A new bit-vector with one bit toggled (0→1 or 1→0)
+    - A one-element list with the index of the bit to toggle (0→1 or 1→0)
     """
-    n = len(solution)
-    idx = random.randrange(n)
-    neighbor = solution.copy()
-    neighbor[idx] = 1 - neighbor[idx]
-    return neighbor
+    return [random.randrange(len(solution.bits))]
 
 
-def all_neighbors(solution: List[int]) -> List[List[int]]:
+def all_neighbors(solution: Solution) -> Sequence[int]:
     """
     Generate all neighbors by flipping each bit of the solution one at a time.
 
     Parameters:
-    - solution: current bit-vector solution
+    - solution: current solution
+
+    Returns:
+    - An array with the indices of all bits, each describing one single-flip neighbor
+    """
+    return np.arange(len(solution.bits))
+
+
+def swap_neighbor(solution: Solution) -> np.ndarray:
+    """
+    Generate the best 1-in/1-out swap for every selected element.
+
+    Dropping a selected value a and adding an unselected value b changes the
+    sum by b - a, so the best partner of a is the unselected value closest to
+    a + gap (gap = target - sum). The selected and unselected values are taken
+    in ascending order from a value order sorted once per problem (O(n) per
+    call); since the queries a + gap are then ascending too, the partners are
+    found by one merge of the two sorted arrays (a vectorized two-pointer scan
+    via searchsorted). The overall best swap is among the returned pairs.
+
+    Parameters:
+    - solution: current solution
+
+    Returns:
+    - An int array of shape (k, 2); row (i, j) flips selected bit i and unselected bit j.
+      Empty when all bits are selected or none is.
+    """
+    order, sorted_values = _sorted_values(solution.problem)
+    selected = np.frombuffer(solution.bits, dtype=np.uint8)[order].astype(bool)
+    out_idx, out_values = order[selected], sorted_values[selected]
+    in_idx, in_values = order[~selected], sorted_values[~selected]
+    if out_idx.size == 0 or in_idx.size == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    wanted = out_values + (solution.problem.target - solution.total)
+    pos = np.searchsorted(in_values, wanted)
+    above = np.minimum(pos, in_values.size - 1)
+    below = np.maximum(pos - 1, 0)
+    partner = np.where(np.abs(in_values[below] - wanted) < np.abs(in_values[above] - wanted), below, above)
+    return np.column_stack((out_idx, in_idx[partner]))
+
+
+def random_swap(solution: Solution) -> Sequence[Tuple[int, int]]:
+    """
+    Generate a single random 1-in/1-out swap (for simulated annealing).
+
+    Parameters:
+    - solution: current solution
 
     Returns:
-    - A list of new bit-vectors, each differing by exactly one bit flip
-    """
-    neighbors: List[List[int]] = []
-    for i in range(len(solution)):
-        neighbor = solution.copy()
-        neighbor[i] = 1 - neighbor[i]
-        neighbors.append(neighbor)
-    return neighbors
+    - A one-element list with a pair (selected bit, unselected bit), or an
+      empty list when all bits are selected or none is
+    """
+    bits = solution.bits
+    n = len(bits)
+    # Rejection sampling is O(1) on average unless one of the two classes is tiny
+    for _ in range(32):
+        i = random.randrange(n)
+        j = random.randrange(n)
+        if bits[i] != bits[j]:
+            return [(i, j) if bits[i] else (j, i)]
+    array = np.frombuffer(bits, dtype=np.uint8)
+    selected = np.flatnonzero(array)
+    unselected = np.flatnonzero(array == 0)
+    if selected.size == 0 or unselected.size == 0:
+        return []
+    return [(int(random.choice(selected)), int(random.choice(unselected)))]
+
+
+def move_objective(solution: Solution, move: Move) -> int:
+    """Objective value after applying a flip or a swap, without applying it."""
+    if isinstance(move, (int, np.integer)):
+        return solution.flip_objective(move)
+    total = solution.total
+    for idx in move:
+        total += solution.flip_delta(idx)
+    return abs(total - solution.problem.target)
+
+
+def apply_move(solution: Solution, move: Move) -> None:
+    """Apply a flip (bit index) or a swap (pair of bit indices) in place."""
+    if isinstance(move, (int, np.integer)):
+        solution.flip(move)
+    else:
+        for idx in move:
+            solution.flip(idx)
+
+
+def _sorted_values(problem) -> Tuple[np.ndarray, np.ndarray]:
+    # Indices of the values in ascending order and the sorted values, computed once per problem
+    cached = _sorted_cache.get(problem)
+    if cached is None:
+        values = np.asarray(problem.values, dtype=np.int64)
+        order = np.argsort(values, kind='stable')
+        cached = (order, values[order])
+        _sorted_cache[problem] = cached
+    return cached
+
+
+class FlipEvaluator:
+    """
+    Vectorized scoring of single-bit flips around a Solution.
+
+    Keeps an array of signed deltas (+v_i for an unselected bit, -v_i for a
+    selected one), so the objective of flipping bit i is |s + delta_i - T|
+    and a whole neighborhood is scored without building any neighbor lists.
+    Moves must be applied through flip() to keep the deltas in sync.
+    """
+    def __init__(self, solution: Solution):
+        self.solution = solution
+        values = np.asarray(solution.problem.values, dtype=np.int64)
+        bits = np.frombuffer(solution.bits, dtype=np.uint8).astype(bool)
+        self.deltas = np.where(bits, -values, values)
+
+    def score(self, moves: Sequence[int]) -> np.ndarray:
+        """
+        Return the objective value after each of the given flips.
+
+        Parameters:
+        - moves: bit indices, or an array of (i, j) swap pairs (as returned by
+          a neighborhood function)
+
+        Returns:
+        - int64 array, entry k is the objective after applying moves[k]
+        """
+        gap = self.solution.total - self.solution.problem.target
+        deltas = self.deltas[np.asarray(moves)]
+        if deltas.ndim == 2:
+            deltas = deltas.sum(axis=1)
+        return np.abs(deltas + gap)
+
+    def flip(self, idx: int) -> None:
+        """Apply the flip of bit idx to the solution and to the delta array."""
+        self.solution.flip(idx)
+        self.deltas[idx] = -self.deltas[idx]
+
+    def apply(self, move: Move) -> None:
+        """Apply a flip (bit index) or a swap (pair of bit indices)."""
+        for idx in np.atleast_1d(move):
+            self.flip(int(idx))
@@ -0,0 +1,156 @@
+import math
+from typing import Optional
+
+import numpy as np
+
+from solver.problem import SubsetSum, Solution
+
+
+class Reduction:
+    """
+    A reduced Subset Sum instance together with the mapping back to the original.
+
+    Every reduced value stands for a group of original indices that are
+    selected together: the groups are stored back to back in `members`, and
+    reduced value k covers the next sizes[k] entries. `fixed` lists original
+    indices that are selected in every solution (only used by the trivial
+    target >= total case).
+
+    Attributes:
+    - original: the SubsetSum instance as loaded
+    - problem: the reduced SubsetSum instance handed to the algorithms
+    - members: original indices grouped by reduced value (None = identity mapping)
+    - sizes: number of original indices per reduced value (None = identity mapping)
+    - fixed: original indices always selected
+    - scale: common divisor taken out of the values and the target (1 if none)
+    - trivial: True if the optimum was decided without search (problem.n == 0)
+    """
+    def __init__(
+        self,
+        original: SubsetSum,
+        problem: SubsetSum,
+        members: Optional[np.ndarray] = None,
+        sizes: Optional[np.ndarray] = None,
+        fixed: Optional[np.ndarray] = None,
+        scale: int = 1
+    ):
+        self.original = original
+        self.problem = problem
+        self.members = members
+        self.sizes = sizes
+        self.fixed = fixed if fixed is not None else np.empty(0, dtype=np.int64)
+        self.scale = scale
+        self.trivial = problem.n == 0
+
+    def restore(self, solution: Solution) -> Solution:
+        """Map a solution of the reduced instance to a Solution over the original indices."""
+        if self.members is None:
+            return self.original.solution(solution.bits)
+        bits = np.zeros(self.original.n, dtype=np.uint8)
+        bits[self.fixed] = 1
+        chosen = np.frombuffer(bytes(solution.bits), dtype=np.uint8)
+        bits[self.members] = np.repeat(chosen, self.sizes)
+        return self.original.solution(bits.tobytes())
+
+
+def preprocess(problem: SubsetSum) -> Reduction:
+    """
+    Reduce an instance before solving it.
+
+    The passes, in order:
+    - trivial targets: with target <= 0 the empty subset is optimal;
+    - values that cannot be in an optimal subset are dropped: zeros, and
+      values above 2*target (any subset containing one is farther from the
+      target than the empty subset);
+    - duplicate values are collapsed: c copies of v become items
+      v, 2v, 4v, ... (binary splitting of the multiplicity), so any count
+      0..c is still reachable with O(log c) items;
+    - if the remaining values sum to at most the target, taking all of them
+      is optimal;
+    - the gcd g of the remaining items and the target is divided out. Every
+      objective of the reduced instance is then exactly g times smaller, so
+      no target is snapped and the reduced optimum is the original one.
+
+    The passes are vectorized around one sort of the values (only runs of
+    3 or more duplicates are split in a Python loop). When nothing can be reduced the
+    original instance is returned as is, without copying its values.
+    Instances with negative values are returned unreduced.
+
+    Parameters:
+    - problem: SubsetSum instance as loaded
+
+    Returns:
+    - Reduction holding the reduced instance and the index mapping
+    """
+    empty = np.empty(0, dtype=np.int64)
+    values = np.asarray(problem.values, dtype=np.int64)
+    target = problem.target
+    if problem.n and values.min() < 0:
+        return Reduction(problem, problem)
+    if target <= 0:
+        return Reduction(problem, SubsetSum([], 0), empty, empty)
+
+    # Useful values sorted by value; equal values form runs of consecutive entries
+    useful = np.flatnonzero((values > 0) & (values <= 2 * target))
+    order = useful[np.argsort(values[useful])]
+    sorted_values = values[order]
+    starts = np.flatnonzero(np.diff(sorted_values, prepend=-1))
+    counts = np.diff(starts, append=len(order))
+    # Binary splitting only shrinks runs of 3 or more copies
+    split = counts >= 3
+
+    # Nothing to reduce: keep the original instance (and its memory-mapped values)
+    if len(useful) == problem.n and not split.any() and _exceeds(values, target) \
+            and math.gcd(int(np.gcd.reduce(values)), target) == 1:
+        return Reduction(problem, problem)
+
+    # Values in runs of 1 or 2 copies map to one item each
+    kept = ~np.repeat(split, counts)
+    item_values = [sorted_values[kept]]
+    item_sizes = [np.ones(int(kept.sum()), dtype=np.int64)]
+    members = [order[kept]]
+
+    # Binary splitting of multiplicities: item k*v stands for k copies of v
+    for start, count in zip(starts[split].tolist(), counts[split].tolist()):
+        v = int(sorted_values[start])
+        pos = 0
+        size = 1
+        while pos < count:
+            size = min(size, count - pos)
+            if size * v <= 2 * target:
+                item_values.append(np.array([size * v], dtype=np.int64))
+                item_sizes.append(np.array([size], dtype=np.int64))
+                members.append(order[start + pos:start + pos + size])
+            pos += size
+            size *= 2
+
+    item_values = np.concatenate(item_values)
+    sizes = np.concatenate(item_sizes)
+    members = np.concatenate(members)
+
+    if not _exceeds(item_values, target):
+        return Reduction(problem, SubsetSum([], 0), empty, empty, members)
+
+    # Keep the items in the original order of their first members; these indices
+    # are distinct, so a scatter over 0..n-1 orders them without sorting
+    old_start = np.cumsum(sizes) - sizes
+    slot = np.full(problem.n, -1, dtype=np.int64)
+    slot[members[old_start]] = np.arange(len(sizes))
+    keep = slot[slot >= 0]
+    item_values, new_sizes = item_values[keep], sizes[keep]
+    new_start = np.cumsum(new_sizes) - new_sizes
+    within = np.arange(len(members)) - np.repeat(new_start, new_sizes)
+    members = members[np.repeat(old_start[keep], new_sizes) + within]
+
+    # Divide out the divisor common to the values and the target
+    scale = math.gcd(int(np.gcd.reduce(item_values)), target)
+    reduced_values = item_values // scale
+    reduced_target = target // scale
+    return Reduction(problem, SubsetSum(reduced_values, reduced_target), members, new_sizes, scale=scale)
+
+
+def _exceeds(values: np.ndarray, target: int) -> bool:
+    # True if sum(values) > target; the int64 sum is only used when it cannot overflow
+    if values.sum(dtype=np.float64) < 2 ** 62:
+        return int(values.sum()) > target
+    return sum(values.tolist()) > target
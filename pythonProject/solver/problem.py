@@ -1,5 +1,14 @@
 import random
-from typing import List
+from itertools import compress
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+from solver.formats import BINARY_SUFFIX, read_binary, read_text
+
+if TYPE_CHECKING:
+    from solver.algorithms.dp import SumIndex
 
 
 class SubsetSum:
@@ -7,11 +16,12 @@ class SubsetSum:
     Represents a Subset Sum problem instance.
 
     Attributes:
-    - values: list of integers (the input numbers)
+    - values: the input numbers, a list of ints or an int64 NumPy array
+      (from_file returns an array, memory-mapped for .ssb files)
     - target: integer (the desired sum)
     - n: number of elements in 'values'
     """
-    def __init__(self, values: List[int], target: int):
+    def __init__(self, values: Sequence[int], target: int):
         self.values = values
         self.target = target
         self.n = len(values)
@@ -21,43 +31,140 @@ class SubsetSum:
         """
         Load a Subset Sum instance from a file.
 
-        Expected file format:
+        Expected text file format:
             n target
             a1 a2 ... an
 
         Where 'n' is the number of values and 'target' is the desired sum.
+        The text is parsed in chunks straight into an int64 array. Files with
+        the .ssb suffix use the binary format (see solver.formats) and their
+        values are memory-mapped without parsing or copying.
         """
-        with open(path, 'r') as f:
-            # Read and parse the first line (n and target)
-            first_line = f.readline().strip().split()
-            if len(first_line) != 2:
-                raise ValueError(f"Invalid header line: {first_line}")
-            n, target = map(int, first_line)
-
-            # Read and parse the list of values
-            values_tokens = f.readline().strip().split()
-            values = list(map(int, values_tokens))
-
-        # Validate that we have exactly n values
-        if len(values) != n:
-            raise ValueError(f"Expected {n} values, but got {len(values)}")
-
+        if Path(path).suffix == BINARY_SUFFIX:
+            values, target = read_binary(path)
+        else:
+            values, target = read_text(path)
         return SubsetSum(values, target)
 
-    def random_solution(self) -> List[int]:
+    def random_solution(self) -> 'Solution':
         """
         Generate a random solution represented as a bit-vector of length n.
 
         Each entry is 0 (exclude that value) or 1 (include that value).
         """
-        return [random.choice([0, 1]) for _ in range(self.n)]
+        return Solution(self, random_bits(self.n))
+
+    def solution(self, bits: Iterable[int]) -> 'Solution':
+        """
+        Build a Solution from any 0/1 sequence (list, tuple, bytes, ...).
+
+        The running sum is computed once here (O(n)); every later flip is O(1).
+        """
+        return Solution(self, bits)
 
-    def objective(self, solution: List[int]) -> int:
+    def sum_index(self, max_memory_mb: float = 1024) -> 'SumIndex':
+        """
+        Build a reusable index of the achievable sums of these values.
+
+        The index ignores self.target: build it once, then answer any number
+        of targets with index.closest(target) (sum only) or
+        index.query(target) (subset and objective). See solver.algorithms.dp.SumIndex.
+        """
+        from solver.algorithms.dp import SumIndex
+        return SumIndex(self, max_memory_mb=max_memory_mb)
+
+    def objective(self, solution: Iterable[int]) -> int:
         """
         Compute the objective value for a given solution.
 
         Returns the absolute difference between the sum of selected values
-        and the target.
+        and the target. A Solution answers from its cached sum in O(1).
         """
+        if isinstance(solution, Solution):
+            return abs(solution.total - self.target)
         total = sum(val for val, bit in zip(self.values, solution) if bit)
         return abs(total - self.target)
+
+
+# Maps the ASCII digits of a binary string to 0/1 bytes
+_BINARY_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def random_bits(n: int) -> bytearray:
+    """
+    Return n independent random bits as a bytearray of 0/1 bytes.
+
+    Draws a single n-bit integer instead of calling the RNG once per bit.
+    """
+    if n == 0:
+        return bytearray()
+    return bytearray(format(random.getrandbits(n), f'0{n}b').encode().translate(_BINARY_DIGITS))
+
+
+class Solution:
+    """
+    Compact bit-vector solution with a cached running sum.
+
+    Bits are stored one per byte in a bytearray (instead of one 8-byte pointer
+    per list entry) and the sum of the selected values is kept up to date, so
+    flipping a bit, evaluating a flip and reading the objective are all O(1),
+    and copying is a single memory copy.
+
+    Attributes:
+    - problem: the SubsetSum instance the bits refer to
+    - bits: bytearray of 0/1 entries (modified in place by flip)
+    - total: sum of the values selected by bits
+    """
+    __slots__ = ('problem', 'bits', 'total')
+
+    def __init__(self, problem: SubsetSum, bits: Iterable[int]):
+        self.problem = problem
+        self.bits = bytearray(bits)
+        if isinstance(problem.values, np.ndarray):
+            selected = np.frombuffer(self.bits, dtype=np.uint8).astype(bool)
+            self.total = int(problem.values[selected].sum())
+        else:
+            self.total = sum(compress(problem.values, self.bits))
+
+    def __len__(self) -> int:
+        return len(self.bits)
+
+    def __getitem__(self, idx: int) -> int:
+        return self.bits[idx]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.bits)
+
+    def __repr__(self) -> str:
+        return f"Solution({self.tolist()})"
+
+    @property
+    def objective(self) -> int:
+        """Objective value |total - target| of the current bit-vector."""
+        return abs(self.total - self.problem.target)
+
+    def flip_delta(self, idx: int) -> int:
+        """Change of the running sum caused by flipping bit idx."""
+        value = int(self.problem.values[idx])
+        return -value if self.bits[idx] else value
+
+    def flip_objective(self, idx: int) -> int:
+        """Objective value after flipping bit idx, without applying the flip."""
+        return abs(self.total + self.flip_delta(idx) - self.problem.target)
+
+    def flip(self, idx: int) -> None:
+        """Flip bit idx in place and update the running sum."""
+        self.total += self.flip_delta(idx)
+        self.bits[idx] ^= 1
+
+    def copy(self) -> 'Solution':
+        """Return an independent copy of this solution (bits are copied)."""
+        clone = Solution.__new__(Solution)
+        clone.problem = self.problem
+        clone.bits = self.bits[:]
+        clone.total = self.total
+        return clone
+
+    def tolist(self) -> List[int]:
+        """Return the bits as a plain list of 0/1 ints."""
+        return list(self.bits)
@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from solver.cli import solve
+from solver.jobs import InstanceCache, file_key, parse_job_args, result_record, values_key
+from solver.problem import SubsetSum
+
+
+# Module providing a long-lived solver service: python -m solver.serve
+#
+# Clients connect over TCP and send one JSON job per line, with the algorithm,
+# its parameters and the budget given as CLI flags:
+#     {"id": 1, "input": "data/huge.ssb", "args": "--algorithm tabu --time-limit 2"}
+#     {"id": 2, "values": [3, 5, 7], "target": 10, "args": ["-a", "dp", "-t", "1"], "history": true}
+# The server answers with JSON lines tagged with the job's id: 'accepted', then
+# 'running' once a worker picks the job up, 'improvement' whenever the best
+# objective improves, 'progress' every --progress-interval seconds while it
+# runs, and finally one 'result' or 'error'. A connection may have any number
+# of jobs in flight. Every job must set a limit (--time-limit, --max-evals or
+# --max-iters): a running job holds a worker until its budget ends it.
+#
+# Jobs run on a bounded process pool, so concurrent clients are spread over
+# the cores. Every worker keeps an LRU cache of parsed instances keyed by
+# content hash, so a job on a known instance pays neither interpreter
+# start-up nor parsing. Each running job watches a stop flag in shared memory
+# as its budget's stop token: when its client disconnects (or the server shuts
+# down) the job stops at its next budget check and frees its worker.
+
+DEFAULT_PORT = 8765
+# Longest accepted request line (inline instances can be large)
+LINE_LIMIT = 1 << 28
+
+# Worker process state: parsed instances, the queue of events sent back to the
+# server and the stop flags of the job slots
+_instances: Optional[InstanceCache] = None
+_events = None
+_stop_flags = None
+
+
+def _init_worker(events, cache_size: int, stop_flags) -> None:
+    global _instances, _events, _stop_flags
+    _instances = InstanceCache(cache_size)
+    _events = events
+    _stop_flags = stop_flags
+
+
+class _StopFlag:
+    """Stop token of one job slot, shared between the server and the workers."""
+    def __init__(self, slot: int):
+        self.slot = slot
+
+    def is_set(self) -> bool:
+        return bool(_stop_flags[self.slot])
+
+    def set(self) -> None:
+        _stop_flags[self.slot] = 1
+
+
+def _run_job(token: int, slot: int, args: argparse.Namespace, key: str, source, with_history: bool) -> dict:
+    # Runs in a worker: announce the start, reuse or load the instance, solve
+    # while streaming the improvements
+    _events.put((token, {'event': 'running', 'pid': os.getpid()}))
+
+    def on_improvement(entry):
+        _events.put((token, {'event': 'improvement', 'elapsed': entry[0], 'best_obj': int(entry[1])}))
+
+    if isinstance(source, str):
+        problem = _instances.get(key, lambda: SubsetSum.from_file(source))
+    else:
+        values, target = source
+        problem = _instances.get(key, lambda: SubsetSum(np.asarray(values, dtype=np.int64), target))
+    try:
+        best_sol, best_obj, history, elapsed, run_metrics = solve(
+            args, problem, log=lambda msg: None, on_improvement=on_improvement,
+            stop_event=_StopFlag(slot), keep_history=with_history)
+    finally:
+        # Marks the end of this job's events for the server
+        _events.put((token, {'event': 'done'}))
+    return result_record(best_sol, best_obj, history, elapsed, run_metrics, with_history)
+
+
+class SolverServer:
+    """
+    Asyncio JSON-lines solver service backed by a process pool.
+
+    Attributes:
+    - workers: number of worker processes (concurrently running jobs)
+    - cache_size: parsed instances kept by each worker
+    - max_pending: jobs accepted at once (queued + running); more are rejected
+    - progress_interval: seconds between progress events (0 disables them)
+    """
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        cache_size: int = 16,
+        max_pending: int = 1000,
+        progress_interval: float = 1.0
+    ):
+        self.workers = workers or os.cpu_count()
+        self.cache_size = cache_size
+        self.max_pending = max_pending
+        self.progress_interval = progress_interval
+        self.pending = 0
+        self._tokens = itertools.count()
+        self._listeners: Dict[int, Callable[[dict], None]] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # One stop flag per job slot; a slot is free again once its job has left the pool
+        self._stop_flags = None
+        self._free_slots: List[int] = []
+
+    async def serve(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT) -> None:
+        """Start the pool and serve clients until cancelled."""
+        loop = asyncio.get_running_loop()
+        events = multiprocessing.Queue()
+        self._stop_flags = multiprocessing.RawArray('b', self.max_pending)
+        self._free_slots = list(range(self.max_pending))
+        self._pool = ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(events, self.cache_size, self._stop_flags))
+        # Worker events arrive on a multiprocessing queue; a thread hands them to the loop
+        threading.Thread(target=self._forward_events, args=(events, loop), daemon=True).start()
+        try:
+            # Start the workers now rather than on the first jobs
+            await asyncio.gather(*(loop.run_in_executor(self._pool, os.getpid)
+                                   for _ in range(self.workers)))
+            server = await asyncio.start_server(self._handle, host, port, limit=LINE_LIMIT)
+            async with server:
+                print(f"Serving on {host}:{port} with {self.workers} worker(s)", flush=True)
+                await server.serve_forever()
+        finally:
+            # Stop the running jobs so the workers can exit
+            self._stop_flags[:] = [1] * self.max_pending
+            self._pool.shutdown(cancel_futures=True)
+            events.put(None)
+
+    def _forward_events(self, events, loop) -> None:
+        for token, event in iter(events.get, None):
+            loop.call_soon_threadsafe(self._dispatch, token, event)
+
+    def _dispatch(self, token: int, event: dict) -> None:
+        # Events of jobs that already finished are dropped
+        listener = self._listeners.get(token)
+        if listener is not None:
+            listener(event)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # One client connection: every line is a job, run concurrently with the others
+        lock = asyncio.Lock()
+
+        async def send(message: dict) -> None:
+            async with lock:
+                writer.write((json.dumps(message) + '\n').encode())
+                await writer.drain()
+
+        jobs = set()
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    job = asyncio.create_task(self._run(line, send))
+                    jobs.add(job)
+                    job.add_done_callback(jobs.discard)
+            # The client may half-close after its last job and still read the results
+            await asyncio.gather(*jobs, return_exceptions=True)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            for job in jobs:
+                job.cancel()
+            writer.close()
+
+    async def _run(self, line: bytes, send: Callable) -> None:
+        # Validate one job, run it on the pool and report its events
+        try:
+            job = json.loads(line)
+            job_id = job.get('id')
+        except (ValueError, AttributeError):
+            await send({'id': None, 'event': 'error', 'message': 'Request is not a JSON object'})
+            return
+        try:
+            args, key, source = await self._prepare(job)
+        except (ValueError, TypeError, OSError) as e:
+            await send({'id': job_id, 'event': 'error', 'message': str(e)})
+            return
+        # Slots of jobs stopped after a disconnect stay taken until their workers let go of them
+        if self.pending >= self.max_pending or not self._free_slots:
+            await send({'id': job_id, 'event': 'error', 'message': 'Server busy, try again later'})
+            return
+
+        # Worker events (running, improvements, the closing 'done' marker) arrive in order on a queue
+        token = next(self._tokens)
+        events: asyncio.Queue = asyncio.Queue()
+        self.pending += 1
+        self._listeners[token] = events.put_nowait
+        slot = self._free_slots.pop()
+        self._stop_flags[slot] = 0
+        task = self._pool.submit(_run_job, token, slot, args, key, source, bool(job.get('history')))
+        task.add_done_callback(lambda _: self._free_slots.append(slot))
+        future = asyncio.wrap_future(task)
+        next_event = None
+        try:
+            await send({'id': job_id, 'event': 'accepted', 'pending': self.pending})
+            started = next_progress = None
+            while True:
+                if next_event is None:
+                    next_event = asyncio.ensure_future(events.get())
+                # After a failure no 'done' marker follows; after success wait for it
+                if future.done() and future.exception() is not None:
+                    break
+                waiting = {next_event} if future.done() else {next_event, future}
+                timeout = None
+                if started is not None and self.progress_interval:
+                    timeout = max(next_progress - time.perf_counter(), 0)
+                done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if next_event in done:
+                    event, next_event = next_event.result(), None
+                    if event['event'] == 'done':
+                        break
+                    if event['event'] == 'running':
+                        started = time.perf_counter()
+                        next_progress = started + self.progress_interval
+                    await send({'id': job_id, **event})
+                elif not done:
+                    elapsed = time.perf_counter() - started
+                    progress = {'id': job_id, 'event': 'progress', 'elapsed': elapsed}
+                    if args.time_limit:
+                        progress['fraction'] = min(elapsed / args.time_limit, 1.0)
+                    await send(progress)
+                    next_progress += self.progress_interval
+            record = await future
+        except ValueError as e:
+            await send({'id': job_id, 'event': 'error', 'message': str(e)})
+        except Exception as e:
+            # A crashed worker or an algorithm failure ends only this job
+            await send({'id': job_id, 'event': 'error', 'message': f"{type(e).__name__}: {e}"})
+        else:
+            await send({'id': job_id, 'event': 'result', **record})
+        finally:
+            del self._listeners[token]
+            self.pending -= 1
+            # A job still running after its client left (or on an error) is stopped cooperatively
+            if not task.done():
+                self._stop_flags[slot] = 1
+            future.cancel()
+            if next_event is not None:
+                next_event.cancel()
+
+    async def _prepare(self, job: dict):
+        # Parse the job's flags and compute the cache key of its instance
+        if 'values' in job:
+            values, target = job['values'], int(job['target'])
+            key, source, input_path = values_key(values, target), (values, target), '<inline>'
+        elif 'input' in job:
+            source = input_path = job['input']
+            # Hashing a new file reads all of it: keep that off the event loop
+            key = await asyncio.to_thread(file_key, input_path)
+        else:
+            raise ValueError('Job needs "input" (instance path) or "values" and "target"')
+        args = parse_job_args(job.get('args', []), input_path)
+        if args.time_limit is None and args.max_evals is None and args.max_iters is None:
+            raise ValueError('Job needs a limit: --time-limit, --max-evals or --max-iters')
+        return args, key, source
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Serve Subset Sum jobs over TCP as JSON lines.')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Address to listen on')
+    parser.add_argument('--port', '-p', type=int, default=DEFAULT_PORT,
+                        help='Port to listen on')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count(),
+                        help='Worker processes, i.e. jobs running at once')
+    parser.add_argument('--cache-size', type=int, default=16,
+                        help='Parsed instances kept by each worker (LRU)')
+    parser.add_argument('--max-pending', type=int, default=1000,
+                        help='Jobs accepted at once; further jobs are rejected as busy')
+    parser.add_argument('--progress-interval', type=float, default=1.0,
+                        help='Seconds between progress events of a running job (0 = none)')
+    args = parser.parse_args()
+
+    server = SolverServer(args.workers, args.cache_size, args.max_pending, args.progress_interval)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import random
+import threading
+
+from solver.algorithms.tabu import tabu_search
+from solver.budget import Budget
+from solver.neighborhood import all_neighbors
+from solver.problem import SubsetSum
+
+
+def test_budget_reused_after_target_reached():
+    budget = Budget(max_iters=100, target_obj=0)
+
+    # The first run reaches the target, which stops it
+    random.seed(0)
+    _, best_obj, _ = tabu_search(SubsetSum([1, 2, 3, 4], 5), all_neighbors, 2, budget=budget)
+    assert best_obj == 0
+
+    # A later run with the same budget still searches
+    random.seed(1)
+    problem = SubsetSum([random.randint(1, 10 ** 6) for _ in range(50)], 10 ** 7)
+    _, _, history = tabu_search(problem, all_neighbors, 5, budget=budget)
+    assert history.recorded > 1
+
+
+def test_started_runs_get_their_own_stop_token():
+    budget = Budget()
+    first = budget.start()
+    first.stop()
+    assert first.exhausted()
+    assert not budget.start().exhausted()
+
+
+def test_explicit_stop_event_is_shared():
+    event = threading.Event()
+    budget = Budget(stop_event=event)
+    budget.start().stop()
+    assert event.is_set()
+    assert budget.start().exhausted()